@@ -9,9 +9,9 @@
 
 # Import global modules
 import dataclasses
-import itertools
+import functools
 import pathlib
-import sys
+import re
 import typing
 
 # Alternative to typing.get_field_types that is more robust for subclasses
@@ -19,40 +19,54 @@ import typing
 
 
 def get_ga_types(
-    ga_type: typing.Type,
+    ga_type: type,
 ) -> typing.Tuple[typing.Any, typing.Tuple[typing.Any, ...]]:
     """ Return base origin and arguments type of Generic type in a version-independent method
 
     :param ga_type: Generic type defined using typing
     :type ga_type: typing.Generic
     """
-    if sys.version_info >= (3, 8, 0):
-        # python 3.8+: functions were added in 3.8
-        _origin = typing.get_origin(ga_type)
-        _args = typing.get_args(ga_type)
-        if (_origin, _args) == (None, ()):
-            raise TypeError(
-                "Position parameter for get_ga_types must be a Generic class"
-            )
-    elif sys.version_info >= (3, 7, 0):
-        try:
-            _origin = ga_type.__origin__
-            _args = ga_type.__args__
-        except AttributeError as exc:
-            raise TypeError(
-                "Position parameter for get_ga_types must be a Generic class"
-            ) from exc
-    else:
-        raise NotImplementedError("Support is not provided for python version < v3.7")
+    _origin, _args = _ga_origin_args(ga_type)
+    if _origin is None and not _args:
+        raise TypeError(
+            "Position parameter for get_ga_types must be a Generic class"
+        )
     return _origin, _args
 
 
+@functools.lru_cache(maxsize=256)
+def _ga_origin_args(ga_type: typing.Any) -> typing.Tuple[typing.Any, typing.Tuple[typing.Any, ...]]:
+    """ Cached worker for get_ga_types returning (None, ()) if ga_type is not a Generic type
+
+    :param ga_type: Generic type defined using typing
+    :type ga_type: typing.Generic
+    """
+    return typing.get_origin(ga_type), typing.get_args(ga_type)
+
+
 def get_dc_type_hints(dc: object) -> typing.Dict[str, typing.Any]:
     """ Create alternative to typing.get_field_types to see if fix problems
 
     :param dc: dataclass with type hinting from which we will extract the type hints into a dictionary
     :type dc: dataclass
     """
+    # Type hints are fixed when the dataclass is defined so they are resolved once per class
+    dc_class = dc if isinstance(dc, type) else type(dc)
+    return dict(_resolve_dc_type_hints(dc_class))
+
+
+# Generic aliases keep their detailed type hint if origin and arguments are in these sets
+_GA_ORIGIN_TYPES = frozenset({list, dict, set, tuple})
+_GA_ARG_TYPES = frozenset({bool, int, str, list, set, tuple})
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_dc_type_hints(dc: type) -> typing.Tuple[typing.Tuple[str, typing.Any], ...]:
+    """ Cached worker for get_dc_type_hints returning (field name, type hint) pairs in field order
+
+    :param dc: dataclass type with type hinting
+    :type dc: dataclass
+    """
     type_dict = {}
     try:
         fields = dataclasses.fields(dc)
@@ -67,23 +81,62 @@ def get_dc_type_hints(dc: object) -> typing.Dict[str, typing.Any]:
             continue
 
         # Path where type is a generic alias
-        _args_in = True
-
-        for _a in _args:
-            # Only process typing.GenericAlias[bool/int/str/list/set/tuple]
-            if _a not in [bool, int, str, list, set, tuple]:
-                _args_in = False
-                break
-        if _origin in [list, dict, set, tuple] and _args_in:
+        # Only process typing.GenericAlias[bool/int/str/list/set/tuple], note that some
+        # arguments such as the parameter list of typing.Callable are not hashable
+        _args_in = all(isinstance(_a, type) and _a in _GA_ARG_TYPES for _a in _args)
+        if _origin in _GA_ORIGIN_TYPES and _args_in:
             type_dict[x.name] = x.type  # Try basic GenericAlias approach
         else:
             type_dict[x.name] = _origin  # This removes the types of the args
         continue
-    return type_dict
+    return tuple(type_dict.items())
 
 
 # Format single element values, form is : fmt_<dynamic_type>(value, <dest_type>)
 
+# Destination types shared by the format functions
+_NUM_TYPES = frozenset({int, float})
+_SEQ_TYPES = frozenset({list, set, tuple})
+# Wrap a single formatted element in one of _SEQ_TYPES
+_SEQ_WRAPS: typing.Dict[typing.Any, typing.Callable[[typing.Any], typing.Any]] = {
+    list: lambda v: [v],
+    set: lambda v: {v},
+    tuple: lambda v: (v,),
+}
+_DICT_ORIGIN_TYPES = frozenset({list, dict})
+_PATH_TYPES = frozenset({
+    pathlib.Path, pathlib.PosixPath, pathlib.PurePath, pathlib.PurePosixPath, pathlib.PureWindowsPath
+})
+# Element types whose text from fmt_value(x, str) is simply str(x)
+_STR_SCALAR_TYPES = frozenset({bool, float, int, str})
+_STR_TYPE = frozenset({str})
+
+
+def _elems2txt(value: typing.Iterable) -> typing.Iterable[str]:
+    """ Text of each element of a list, set or tuple to be joined by the format functions
+
+    :param value:  container of elements to convert to strings
+    :type value:  list | set | tuple
+    """
+    # Collect the element types in one C-level pass
+    elem_types = set(map(type, value))
+    if elem_types <= _STR_TYPE:
+        return value
+    if elem_types <= _STR_SCALAR_TYPES:
+        return map(str, value)
+    # Mixed containers, only call fmt_value for elements that are not already strings
+    return [x if type(x) is str else fmt_value(x, str) for x in value]
+
+
+# Simple conversions of a known boolean, form is : {<dest_type>: <conversion function>}
+_BOOL_FMTS: typing.Dict[typing.Any, typing.Callable[[typing.Any], typing.Any]] = {
+    int: int,
+    str: str,
+    list: lambda v: [v],
+    set: lambda v: {v},
+    tuple: lambda v: (v,),
+}
+
 
 def fmt_bool(value: bool, fmt: type) -> typing.Any:
     """ Convert known boolean value to fmt
@@ -95,22 +148,12 @@ def fmt_bool(value: bool, fmt: type) -> typing.Any:
     :type fmt:  type class
     """
     # Do nothing
-    if fmt == bool:
+    if fmt is bool:
         return value
-    # First simple conversions
-    if fmt == int:
-        return int(value)
-    if fmt == str:
-        return str(value)
-    # list[bool]
-    if fmt == list:
-        return [value]
-    # set[bool]
-    if fmt == set:
-        return {value}
-    # tuple[bool]
-    if fmt == tuple:
-        return tuple([value])
+    # First simple conversions including list[bool], set[bool] and tuple[bool]
+    fmt_func = _BOOL_FMTS.get(fmt)
+    if fmt_func is not None:
+        return fmt_func(value)
     # typing.[List | Set | Tuple][elem_fmt]
     try:
         base_fmt, _args = get_ga_types(fmt)
@@ -121,24 +164,28 @@ def fmt_bool(value: bool, fmt: type) -> typing.Any:
         # Order is to convert all elements of list to format, then convert the list
         # base_fmt is standard generic format of type
         elem_fmt = _args[0]
-        if base_fmt in [list, set, tuple]:
-            return fmt_list([fmt_bool(value, elem_fmt)], base_fmt)
+        if base_fmt in _SEQ_TYPES:
+            return _SEQ_WRAPS[base_fmt](fmt_bool(value, elem_fmt))
     raise ValueError("Cannot handle putting %s into format %s" % (str(value), str(fmt)))
 
 
+# Simple conversions of a known float, form is : {<dest_type>: <conversion function>}
+_FLOAT_FMTS: typing.Dict[typing.Any, typing.Callable[[typing.Any], typing.Any]] = {
+    str: str,
+    list: lambda v: [v],
+    set: lambda v: {v},
+    tuple: lambda v: (v,),
+}
+
+
 def fmt_float(value: float, fmt: type) -> typing.Any:
     # Do nothing
-    if fmt == float:
+    if fmt is float:
         return value
     # Basic conversions
-    if fmt == str:
-        return str(value)
-    if fmt == list:
-        return [value]
-    if fmt == set:
-        return {value}
-    if fmt == tuple:
-        return (value,)
+    fmt_func = _FLOAT_FMTS.get(fmt)
+    if fmt_func is not None:
+        return fmt_func(value)
     # typing.[List | Set | Tuple][elem_fmt]
     try:
         base_fmt, _args = get_ga_types(fmt)
@@ -150,11 +197,22 @@ def fmt_float(value: float, fmt: type) -> typing.Any:
         # base_fmt is standard generic format of type
 
         elem_fmt = _args[0]
-        if base_fmt in [list, set, tuple]:
-            return fmt_list([fmt_float(value, elem_fmt)], base_fmt)
+        if base_fmt in _SEQ_TYPES:
+            return _SEQ_WRAPS[base_fmt](fmt_float(value, elem_fmt))
     raise ValueError("Cannot handle putting %s into format %s" % (str(value), str(fmt)))
 
 
+# Simple conversions of a known integer, form is : {<dest_type>: <conversion function>}
+_INT_FMTS: typing.Dict[typing.Any, typing.Callable[[typing.Any], typing.Any]] = {
+    bool: bool,
+    str: str,
+    float: float,
+    list: lambda v: [v],
+    set: lambda v: {v},
+    tuple: lambda v: (v,),
+}
+
+
 def fmt_int(value: int, fmt: type) -> typing.Any:
     """ Convert known integer value to fmt
 
@@ -164,24 +222,13 @@ def fmt_int(value: int, fmt: type) -> typing.Any:
     :param fmt:  destination format: bool | float | int | str | list[] | set[] | tuple[]
     :type fmt:  type class
     """
-    # First simple conversions
-    if fmt == int:
+    # Do nothing
+    if fmt is int:
         return value
-    if fmt == bool:
-        return not value == 0
-    if fmt == str:
-        return str(value)
-    if fmt == float:
-        return float(value)
-    # list[int]
-    if fmt == list:
-        return [value]
-    # set[int]
-    if fmt == set:
-        return {value}
-    # tuple[int]
-    if fmt == tuple:
-        return tuple([value])
+    # First simple conversions including list[int], set[int] and tuple[int]
+    fmt_func = _INT_FMTS.get(fmt)
+    if fmt_func is not None:
+        return fmt_func(value)
     # typing.[List | Set | Tuple][elem_fmt]
     try:
         base_fmt, _args = get_ga_types(fmt)
@@ -192,12 +239,15 @@ def fmt_int(value: int, fmt: type) -> typing.Any:
         # Order is to convert all elements of list to format, then convert the list
         # base_fmt is standard generic format of type
         elem_fmt = _args[0]
-        if base_fmt in [list, set, tuple]:
-            # print(base_fmt, elem_fmt, fmt_int(value, elem_fmt))
-            return fmt_list([fmt_int(value, elem_fmt)], base_fmt)
+        if base_fmt in _SEQ_TYPES:
+            return _SEQ_WRAPS[base_fmt](fmt_int(value, elem_fmt))
     raise ValueError("Cannot handle putting %s into format %s" % (str(value), str(fmt)))
 
 
+# Destination types of None that are returned as their empty value
+_NONE_TYPES = frozenset({str, dict, list, set, tuple})
+
+
 def fmt_none(value: None, fmt: type) -> typing.Any:
     """ Convert known None value to fmt
 
@@ -207,19 +257,11 @@ def fmt_none(value: None, fmt: type) -> typing.Any:
     :param fmt:  destination format: str | None | dict | list[] | set[] | tuple[]
     :type fmt:  type class
     """
-    # Simple conversions
+    # Simple conversions, the empty value is created by calling the destination type
     if fmt is None:
         return value
-    if fmt == str:
-        return ""
-    if fmt == dict:
-        return {}
-    if fmt == list:
-        return []
-    if fmt == set:
-        return set()
-    if fmt == tuple:
-        return tuple()
+    if fmt in _NONE_TYPES:
+        return fmt()
     # typing.[List | Set | Tuple][elem_fmt]
     try:
         base_fmt, _args = get_ga_types(fmt)
@@ -229,11 +271,33 @@ def fmt_none(value: None, fmt: type) -> typing.Any:
     else:
         # Order is to convert all elements of list to format, then convert the list
         # base_fmt is standard generic format of type
-        if base_fmt in [list, set, tuple]:
+        if base_fmt in _SEQ_TYPES:
             return fmt_none(value, base_fmt)
     raise ValueError("Cannot handle putting %s into format %s" % (str(value), str(fmt)))
 
 
+# Simple conversions of a known non-empty string, form is : {<dest_type>: <conversion function>}
+_STR_FMTS: typing.Dict[typing.Any, typing.Callable[[typing.Any], typing.Any]] = {
+    bool: lambda v: v.title() == "True",
+    list: lambda v: [v],
+    set: lambda v: {v},
+    tuple: lambda v: (v,),
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def _txt2path(value: str, fmt: typing.Any) -> typing.Any:
+    """ Path of type fmt from text, repeated paths are cached as path objects are immutable
+
+    :param value:  text of path
+    :type value:  string
+
+    :param fmt:  one of _PATH_TYPES
+    :type fmt:  type class
+    """
+    return fmt(value)
+
+
 def fmt_str(value: str, fmt: type) -> typing.Any:
     """ Convert known string value to fmt
 
@@ -244,40 +308,36 @@ def fmt_str(value: str, fmt: type) -> typing.Any:
     :type fmt:  type class
     """
     # Do nothing case
-    if fmt == str:
+    if fmt is str:
         return value
     # Special cases if string is blank and want to return empty dict, list, etc.
     if value == "":
         return fmt_none(None, fmt)
-    # Basic structures
-    if fmt == bool:
-        return value.title() == "True"
-    if fmt in [int, float]:
+    # Basic structures including bool, list[str], set[str] and tuple[str]
+    fmt_func = _STR_FMTS.get(fmt)
+    if fmt_func is not None:
+        return fmt_func(value)
+    if fmt is int:
+        # Plain integer text converts exactly, no precision lost through float
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    if fmt in _NUM_TYPES:
         try:
             new_value = float(value)
         except ValueError:
             # If ValueError then skip else block and it will pass to final return
             pass
         else:
-            if fmt == int:
+            if fmt is int:
                 # Note we only are reformatting here not transforming
                 if int(new_value) == new_value:
                     return int(new_value)
-            if fmt == float:
+            if fmt is float:
                 return new_value
-    if fmt == pathlib.PosixPath:
-        return pathlib.PosixPath(value)
-    if fmt == pathlib.Path:
-        return pathlib.Path(value)
-    # List[str]
-    if fmt == list:
-        return [value]
-    # Set[str]
-    if fmt == set:
-        return {value}
-    # Tuple[str]
-    if fmt == tuple:
-        return tuple([value])
+    if fmt in _PATH_TYPES:
+        return _txt2path(value, fmt)
     # typing.[List | Set | Tuple][elem_fmt]
     try:
         base_fmt, _args = get_ga_types(fmt)
@@ -288,9 +348,9 @@ def fmt_str(value: str, fmt: type) -> typing.Any:
         # Order is to convert all elements of list to format, then convert the list
         # base_fmt is standard generic format of type
         elem_fmt = _args[0]
-        if base_fmt in [list, set, tuple]:
+        if base_fmt in _SEQ_TYPES:
             if value:
-                return fmt_list([fmt_str(value, elem_fmt)], base_fmt)
+                return _SEQ_WRAPS[base_fmt](fmt_str(value, elem_fmt))
     raise ValueError("Cannot handle putting %s into format %s" % (value, str(fmt)))
 
 
@@ -304,18 +364,15 @@ def fmt_dict(value: dict, fmt: type) -> typing.Any:
     :type fmt:  type class
     """
     # Do nothing
-    if fmt == dict:
+    if fmt is dict:
         return value
     # Conversion to comma-delimited string
-    if fmt == str:
+    if fmt is str:
         # Return str(list) but without the square brackets
         return ",".join(fmt_dict(value, typing.List[str]))
-    if fmt == list:
-        new_list = []
-        for x in value.keys():
-            new_list.append(x)
-            new_list.append(value[x])
-        return new_list
+    if fmt is list:
+        # Flatten to [key_0, value_0, key_1, value_1, ...]
+        return [y for item in value.items() for y in item]
     # typing.[List | Dict]
     try:
         base_fmt, _args = get_ga_types(fmt)
@@ -325,18 +382,16 @@ def fmt_dict(value: dict, fmt: type) -> typing.Any:
     else:
         # Order is to convert all elements of list to format, then convert the list
         # base_fmt is standard generic format of type
-        if base_fmt in [list, dict]:
+        if base_fmt in _DICT_ORIGIN_TYPES:
             key_fmt = _args[0]
-            if base_fmt == list:
+            if base_fmt is list:
                 value_fmt = key_fmt
             else:
                 value_fmt = _args[1]
-            new_dict = {}
-            for x, y in zip(value.keys(), value.values()):
-                new_key = fmt_value(x, key_fmt)
-                new_value = fmt_value(y, value_fmt)
-                if new_key not in new_dict:
-                    new_dict[new_key] = new_value
+            new_dict: typing.Dict[typing.Any, typing.Any] = {}
+            for x, y in value.items():
+                # Keep the first value if formatting makes keys collide
+                new_dict.setdefault(fmt_value(x, key_fmt), fmt_value(y, value_fmt))
             return fmt_dict(new_dict, base_fmt)
     raise ValueError("Cannot handle putting %s into format %s" % (value, str(fmt)))
 
@@ -351,19 +406,19 @@ def fmt_list(value: list, fmt: type) -> typing.Any:
     :type fmt:  type class
     """
     # Do nothing
-    if fmt == list:
+    if fmt is list:
         return value
     # Conversion to comma-delimited string
-    if fmt == str:
+    if fmt is str:
         # Return str(list) but without the square brackets
-        return ",".join([fmt_value(x, str) for x in value])
+        return ",".join(_elems2txt(value))
     # Basic conversions
-    if fmt == set:
+    if fmt is set:
         return set(value)
-    if fmt == tuple:
+    if fmt is tuple:
         return tuple(value)
     # Dict, if length is even then define using adjacent pairs in order
-    if fmt == dict and len(value) % 2 == 0:
+    if fmt is dict and len(value) % 2 == 0:
         return {value[k]: value[k + 1] for k in range(0, len(value), 2)}
     # Generic types
     try:
@@ -374,20 +429,26 @@ def fmt_list(value: list, fmt: type) -> typing.Any:
     else:
         # Order is to convert all elements of list to format, then convert the list
         # base_fmt is standard generic format of type
-        if base_fmt in [dict, list, set, tuple]:
+        if base_fmt in _GA_ORIGIN_TYPES:
             if len(value):
-                # Format the elements then repass into function to set base_fmt
-                if base_fmt == dict:
-                    # Note if odd elements, will capture error on second fmt_list call
-                    new_list = []
-                    for elem_value, elem_fmt in zip(value, itertools.cycle(_args)):
-                        new_list.append(fmt_value(elem_value, elem_fmt))
+                if base_fmt is dict:
+                    # Keys and values alternate, note if odd elements will capture error at end
+                    if len(value) % 2 == 0:
+                        key_fmt, value_fmt = _args
+                        return {
+                            fmt_value(k, key_fmt): fmt_value(v, value_fmt)
+                            for k, v in zip(value[0::2], value[1::2])
+                        }
                 else:
+                    # Format the elements then repass into function to set base_fmt
                     elem_fmt = _args[0]
-                    new_list = [fmt_value(x, elem_fmt) for x in value]
-                return fmt_list(new_list, base_fmt)
-            # Handle empty list so no elements to format
-            return fmt_list(value, base_fmt)
+                    # Elements already of elem_fmt are returned as is by fmt_value so only copy them
+                    if all(type(x) is elem_fmt for x in value):
+                        return fmt_list(list(value), base_fmt)
+                    return fmt_list([fmt_value(x, elem_fmt) for x in value], base_fmt)
+            else:
+                # Handle empty list so no elements to format
+                return fmt_list(value, base_fmt)
     raise ValueError("Cannot handle putting %s into format %s" % (str(value), str(fmt)))
 
 
@@ -401,17 +462,16 @@ def fmt_set(value, fmt) -> typing.Any:
     :type fmt:  type class
     """
     # Do nothing
-    if fmt == set:
+    if fmt is set:
         return value
     # Conversion to comma-delimited string
-    if fmt == str:
+    if fmt is str:
         # Return str(list) but without the square brackets
-        new_value = {fmt_value(x, str) for x in value}
-        return ",".join(sorted(new_value))
+        return ",".join(sorted(set(_elems2txt(value))))
     # Basic conversions
-    if fmt == list:
+    if fmt is list:
         return list(value)
-    if fmt == tuple:
+    if fmt is tuple:
         return tuple(value)
     # Generic types
     try:
@@ -423,7 +483,7 @@ def fmt_set(value, fmt) -> typing.Any:
         # Order is to convert all elements of set to format, then convert the set
         # base_fmt is standard generic format of type
         elem_fmt = _args[0]
-        if base_fmt in [list, set, tuple]:
+        if base_fmt in _SEQ_TYPES:
             new_set = {fmt_value(x, elem_fmt) for x in value}
             return fmt_set(new_set, base_fmt)
     raise ValueError("Cannot handle putting %s into format %s" % (str(value), str(fmt)))
@@ -440,16 +500,16 @@ def fmt_tuple(value: tuple, fmt: type) -> typing.Any:
     """
     """ Convert known tuple to fmt """
     # Do nothing
-    if fmt == tuple:
+    if fmt is tuple:
         return value
     # Conversion to comma-delimited string
-    if fmt == str:
+    if fmt is str:
         # Return str(list) but without the square brackets
-        return ",".join([fmt_value(x, str) for x in value])
+        return ",".join(_elems2txt(value))
     # Basic conversions
-    if fmt == list:
+    if fmt is list:
         return list(value)
-    if fmt == set:
+    if fmt is set:
         return set(value)
     # typing Generic Types
     try:
@@ -460,12 +520,26 @@ def fmt_tuple(value: tuple, fmt: type) -> typing.Any:
     else:
         # base_fmt is standard generic format of type
         elem_fmt = _args[0]
-        if base_fmt in [list, set, tuple]:
-            new_tuple = tuple([fmt_value(x, elem_fmt) for x in value])
-            return fmt_tuple(new_tuple, base_fmt)
+        if base_fmt in _SEQ_TYPES:
+            # Convert the formatted elements straight into base_fmt without an interim tuple
+            return fmt_list([fmt_value(x, elem_fmt) for x in value], base_fmt)
     raise ValueError("Cannot handle putting %s into format %s" % (str(value), str(fmt)))
 
 
+# Format functions keyed on the dynamic type of the value, bool must precede int
+_FMT_DISPATCH: typing.Dict[typing.Any, typing.Callable[[typing.Any, type], typing.Any]] = {
+    type(None): fmt_none,
+    bool: fmt_bool,
+    dict: fmt_dict,
+    float: fmt_float,
+    int: fmt_int,
+    list: fmt_list,
+    set: fmt_set,
+    str: fmt_str,
+    tuple: fmt_tuple,
+}
+
+
 def fmt_value(value: typing.Any, fmt: type) -> typing.Any:
     """ Convert value of inferred type to fmt
 
@@ -477,53 +551,79 @@ def fmt_value(value: typing.Any, fmt: type) -> typing.Any:
     """
     # Note that we are purposely using type rather than isinstance to distingish bool
     # from int as well as subscripted generic types cannot use isinstance.
-    if type(value) == fmt:
+    value_type = type(value)
+    if value_type is fmt:
         return value
-    if value is None:
-        return fmt_none(value, fmt)
-    if isinstance(value, bool):
-        return fmt_bool(value, fmt)
-    if isinstance(value, dict):
-        return fmt_dict(value, fmt)
-    if isinstance(value, float):
-        return fmt_float(value, fmt)
-    if isinstance(value, int):
-        return fmt_int(value, fmt)
-    if isinstance(value, list):
-        return fmt_list(value, fmt)
-    if isinstance(value, set):
-        return fmt_set(value, fmt)
-    if isinstance(value, str):
-        return fmt_str(value, fmt)
-    if isinstance(value, tuple):
-        return fmt_tuple(value, fmt)
-    raise ValueError("Cannot handle putting %s into format %s" % (str(value), str(fmt)))
+    fmt_func = _FMT_DISPATCH.get(value_type)
+    if fmt_func is None:
+        # Subclasses of the base types (e.g., OrderedDict) are matched in dispatch order
+        for base_type, base_func in _FMT_DISPATCH.items():
+            if isinstance(value, base_type):
+                fmt_func = base_func
+                break
+        else:
+            raise ValueError("Cannot handle putting %s into format %s" % (str(value), str(fmt)))
+    return fmt_func(value, fmt)
+
+
+@functools.lru_cache(maxsize=None)
+def _make_dc_formatter(dc: type) -> typing.Callable[[typing.Any], typing.Any]:
+    """ Generate the function formatting each field of an instance of dc to its type hint
+
+    :param dc: dataclass type with type hints defined
+    :type dc: dataclass
+    """
+    # Generated source is, e.g.,
+    #   def fmt_dc(dc):
+    #       v = dc.x
+    #       v_0 = v if type(v) is fmt_0 else fmt_value(v, fmt_0)
+    #       ...
+    #       return dc_class(v_0, ...)
+    # where values already of their plain type hint skip the call to fmt_value. Lists, dicts
+    # and sets are copied instead so the result does not share them with dc. Fields are
+    # passed by position except keyword-only fields (python 3.10+) which must be named.
+    fmt_globals: typing.Dict[str, typing.Any] = {"dc_class": dc, "fmt_value": fmt_value}
+    fmt_lines = ["def fmt_dc(dc):"]
+    pos_args = []
+    kw_args = []
+    kw_only = {x.name for x in dataclasses.fields(dc) if getattr(x, "kw_only", False) is True}
+    for i, (name, fmt) in enumerate(_resolve_dc_type_hints(dc)):
+        fmt_globals["fmt_%d" % i] = fmt
+        fmt_lines.append("    v = dc.%s" % name)
+        keep = "v.copy()" if fmt in (list, dict, set) else "v"
+        fmt_lines.append("    v_%d = %s if type(v) is fmt_%d else fmt_value(v, fmt_%d)" % (i, keep, i, i))
+        if name in kw_only:
+            kw_args.append("%s=v_%d" % (name, i))
+        else:
+            pos_args.append("v_%d" % i)
+    fmt_lines.append("    return dc_class(%s)" % ", ".join(pos_args + kw_args))
+    exec("\n".join(fmt_lines) + "\n", fmt_globals)
+    return fmt_globals["fmt_dc"]
 
 
 def fmt_dataclass(dc: object) -> object:
-    """ Format the variable values in dataclass according to its defined type hints
+    """ Format the variable values in dataclass according to its defined type hints. Lists,
+        dicts and sets are copied to the new dataclass but their items are shared with dc.
 
     :param dc: dataclass with type hints defined but with unformatted values
     :type dc: dataclass
     """
+    if isinstance(dc, type) or not dataclasses.is_dataclass(dc):
+        raise TypeError("Must supply a type hinted dataclass as input")
+    dc_class: type = type(dc)
     try:
-        dc_dict = dataclasses.asdict(dc)
-        dc_types = get_dc_type_hints(dc)
-    except TypeError as exc:
-        raise TypeError("Must supply a type hinted dataclass as input") from exc
-
-    rdc_dict = {}
-    for x in dc_dict:
-        try:
-            rdc_dict[x] = fmt_value(dc_dict[x], dc_types[x])
-        except ValueError as exc:
-            raise ValueError(
-                "Cannot handle putting field %s = %s into format %s"
-                % (str(x), str(dc_dict[x]), str(dc_types[x]))
-            ) from exc
-
-    rdc = getattr(dc, "__class__")
-    return rdc(**rdc_dict)
+        return _make_dc_formatter(dc_class)(dc)
+    except ValueError:
+        # Rerun the fields one at a time to report the field that could not be formatted
+        for x, fmt in _resolve_dc_type_hints(dc_class):
+            try:
+                fmt_value(getattr(dc, x), fmt)
+            except ValueError as exc:
+                raise ValueError(
+                    "Cannot handle putting field %s = %s into format %s"
+                    % (str(x), str(getattr(dc, x)), str(fmt))
+                ) from exc
+        raise
 
 
 # Routines to convert a value from one type to text and vice versa. These can serve as
@@ -536,9 +636,32 @@ def str2list(name: typing.Union[str, list]) -> list:
     :param name:  standardizes input of string or list to be a list
     :type name:  string | list
     """
-    if not isinstance(name, (str, list)):
-        raise ValueError("Expecting name %s to be a string or a list", name)
-    return fmt_value(name, list)
+    # Both shapes are trivial so no need to dispatch through fmt_value
+    if isinstance(name, list):
+        return name
+    if isinstance(name, str):
+        return [name] if name else []
+    raise ValueError("Expecting name %s to be a string or a list", name)
+
+
+def _set2txt(v: set) -> str:
+    """ Comma-delimited text of set v, sorted to make the order deterministic """
+    return ",".join([fmt_value(x, str) for x in sorted(v)])
+
+
+# Text of values by their exact type, form is : {<dynamic_type>: <conversion function>}
+_VAL2TXT: typing.Dict[typing.Any, typing.Callable[[typing.Any], str]] = {
+    str: lambda v: v,
+    bool: str,
+    float: str,
+    int: str,
+    type(None): lambda v: "",
+    dict: lambda v: fmt_dict(v, str),
+    list: lambda v: fmt_list(v, str),
+    set: _set2txt,
+    tuple: lambda v: fmt_tuple(v, str),
+}
+_VAL2TXT.update({path_type: str for path_type in _PATH_TYPES})
 
 
 def val2txt(v: typing.Any) -> str:
@@ -547,68 +670,101 @@ def val2txt(v: typing.Any) -> str:
     :param v:  input value to be converted to a string
     :type v:  bool | dict | float | int | list | tuple | pathlib.Path | pathlib.PurePath | pathlib.PosixPath
     """
+    # Values of the acceptable types are handled with a single lookup
+    to_txt = _VAL2TXT.get(type(v))
+    if to_txt is not None:
+        return to_txt(v)
+    # Subclasses of the acceptable types
     if isinstance(v, str):
         return v
     if isinstance(v, (pathlib.Path, pathlib.PurePath, pathlib.PosixPath)):
         return str(v)
     if isinstance(v, set):
-        return fmt_list(sorted(v), str)
+        return _set2txt(v)
     if isinstance(v, (bool, dict, float, int, list, tuple)) or v is None:
         return fmt_value(v, str)
     raise ValueError("Following value cannot be converted to text", v)
 
 
+def _txt2float(v: str) -> typing.Union[int, float]:
+    """ Convert base 10 float text, returning, e.g., 1 and not 1.0 if it is an integer """
+    fv = float(v)
+    if fv.is_integer():
+        return int(fv)
+    return fv
+
+
+# Numbers recognized by txt2val: integers of base 2, 8, or 16 and numbers of base 10. As in
+# python literals, single underscores may group the digits, e.g., 1_000, 0b1_0 or 0x_ff, and
+# surrounding whitespace is ignored
+_TXT_NUM_RE = re.compile(
+    r"\s*(?:(?P<bin>0[bB]_?[01](?:_?[01])*)|(?P<oct>0[oO]_?[0-7](?:_?[0-7])*)"
+    r"|(?P<hex>0[xX]_?[0-9a-fA-F](?:_?[0-9a-fA-F])*)"
+    r"|(?P<int>[+-]?\d(?:_?\d)*)"
+    r"|(?P<float>[+-]?(?:\d(?:_?\d)*(?:\.(?:\d(?:_?\d)*)?)?|\.\d(?:_?\d)*)(?:[eE][+-]?\d(?:_?\d)*)?))\s*"
+)
+_TXT_NUM_FMTS: typing.Dict[str, typing.Callable[[str], typing.Any]] = {
+    "bin": lambda v: int(v, 2),
+    "oct": lambda v: int(v, 8),
+    "hex": lambda v: int(v, 16),
+    "int": int,
+    "float": _txt2float,
+}
+
+
+# Boolean keywords recognized by txt2val in any case, e.g., true, TRUE, False
+_TXT_BOOLS = {"True": True, "False": False}
+
+
+@functools.lru_cache(maxsize=4096)
+def _txt2scalar(v: str) -> typing.Any:
+    """ Convert text of a single value to guessed python type, repeated values are cached
+
+    :param v:  text of a single value without commas
+    :type v:  string
+    """
+    if v == "None":
+        return None
+    # Only title case the text if it is long enough to be a boolean keyword
+    if 4 <= len(v) <= 5:
+        bool_value = _TXT_BOOLS.get(v.title())
+        if bool_value is not None:
+            return bool_value
+    # Plain integers are the most common numbers so test for them before the regex
+    if v.isdecimal() or (v[:1] in ("+", "-") and v[1:].isdecimal()):
+        return int(v)
+    # Otherwise classify the number in a single regex pass, text that does not match is
+    # returned as is
+    m = _TXT_NUM_RE.fullmatch(v)
+    if m is None or m.lastgroup is None:
+        return v
+    return _TXT_NUM_FMTS[m.lastgroup](m.group(m.lastgroup))
+
+
 def txt2val(v: str) -> typing.Any:
     """ Convert text value provided to guessed python type
 
     :param v:  value of unknown type read in from a string input
     :type v:  string
     """
-    # If the string contains a boolean keyword then treat as boolean
     if not isinstance(v, str):
         return v
-    if v == "None":
-        return None
-    if v.title() in ["True", "False"]:
-        return v.title() == "True"
     # If the string contains a comma treat as list
     if "," in v:
         nv = v.split(",")
         return [txt2val(x.strip()) for x in nv]
-    # Otherwise check if it is a number
-    # First address integers of base 2, 8, or 16
-    if len(v) > 2:
-        if v[:2] == "0b":
-            try:
-                nv = int(v, 2)
-            except (TypeError, ValueError):
-                return v
-            else:
-                return nv
-        elif v[:2] == "0o":
-            try:
-                nv = int(v, 8)
-            except (TypeError, ValueError):
-                return v
-            else:
-                return nv
-        elif v[:2] == "0x":
-            try:
-                nv = int(v, 16)
-            except (TypeError, ValueError):
-                return v
-            else:
-                return nv
-    # From this address numbers base 10 or other
-    try:
-        fv = float(v)
-    except (TypeError, ValueError):
-        # An error is raised if not a number so return text string
-        return v
-    # Test numeric value if it is an integer so we return, e.g., 1 and not 1.0
-    if int(fv) == fv:
-        return int(fv)
-    return fv
+    return _txt2scalar(v)
+
+
+@functools.lru_cache(maxsize=None)
+def _dc_layout(dc: type) -> typing.Tuple[int, typing.Any]:
+    """ Return number of fields and type hint of the first field of dataclass dc
+
+    :param dc: dataclass type with type hinting
+    :type dc: dataclass
+    """
+    dc_types = _resolve_dc_type_hints(dc)
+    return len(dc_types), dc_types[0][1]
 
 
 def process_container(
@@ -625,7 +781,7 @@ def process_container(
         the container to List[dc]
     :type dc: type (either str or dataclass)
     """
-    if dc == str:
+    if dc is str:
         if isinstance(container, str):
             return [container]
         if isinstance(container, list):
@@ -644,15 +800,11 @@ def process_container(
         if all(isinstance(x, dc) for x in container):
             return container
         try:
-            dc_fmt = get_dc_type_hints(dc)
+            n_fields, fmt_0 = _dc_layout(dc)
         except TypeError as exc:
             raise TypeError(
                 "If type is not specified as string then dc must be a dataclass"
             ) from exc
-        n_fields = len(dc_fmt.keys())
-        # print('here:', container)
-        fmt_0 = dc_fmt[dataclasses.fields(dc)[0].name]
-        # print('  there:', fmt_0)
         # List[Values]
         if len(container) == n_fields:
             # Require that if a list of values is supplied, at least first element needs to
@@ -661,10 +813,9 @@ def process_container(
             if isinstance(container[0], fmt_0):
                 return [dc(*container)]
             # If fail, still possible that it is List[List[values]]
-        # List[List[values]]
-        if all(isinstance(x, list) for x in container):
-            if all(len(x) == n_fields and isinstance(x[0], fmt_0) for x in container):
-                return [dc(*x) for x in container]
+        # List[List[values]], each row is checked in a single pass
+        if all(isinstance(x, list) and len(x) == n_fields and isinstance(x[0], fmt_0) for x in container):
+            return [dc(*x) for x in container]
         raise ValueError(
             "If container is a list, "
             + "it must contain only dataclasses or lists and not both"
@@ -689,23 +840,17 @@ def populate_list(c: object, dc: typing.Union[type, object]) -> list:
     :type dc:  dataclass
     """
     if dataclasses.is_dataclass(dc):
-        fields_dict = get_dc_type_hints(dc)
-        if not isinstance(dc, type):
-            dc = type(dc)
+        dc_class: type = dc if isinstance(dc, type) else type(dc)
+        # Only the field names are needed so read the cached pairs directly
+        dc_fields = _resolve_dc_type_hints(dc_class)
     else:
         raise TypeError(
             "Second parameter must be a dataclass or an instance of a dataclass"
         )
-    # Now create list of extracted fields from c that exist in dc
-    ret_list = []
-    c_attrs = dir(c)
-    for field in fields_dict:
-        if field in c_attrs:
-            ret_list.append(getattr(c, field))
-        else:
-            ret_list.append("")
-    # Return instance of type dc
-    return ret_list
+    # Now create list of extracted fields from c that exist in dc, fields missing from c are blank.
+    # Only attributes listed by dir(c) count so those served by __getattr__ are also blank
+    c_attrs = set(dir(c))
+    return [getattr(c, field) if field in c_attrs else "" for field, _fmt in dc_fields]
 
 
 def define_dataclass(c: object, dc: type) -> object:
@@ -736,7 +881,7 @@ def read_txt(input_list: list) -> list:
     :param input_list:  unformatted list of strings
     :type input_list:  list[str]
     """
-    return [txt2val(x) for x in input_list]
+    return list(map(txt2val, input_list))
 
 
 # Set of functions to prep data from dataclass for output to text only CSV write
@@ -10,6 +10,7 @@
 # Standard global modules
 import csv
 import dataclasses
+import functools
 import pathlib
 import typing
 
@@ -19,23 +20,66 @@ import xlrd
 
 # Import local modules
 from .formatting import read_txt, write_txt_class, write_txt_row, \
-    process_container, fmt_dataclass, get_dc_type_hints
+    process_container, fmt_dataclass, get_dc_type_hints, populate_list, val2txt
 
 # Register default dialect
 csv.register_dialect('__unixpipe', delimiter='|', quoting=csv.QUOTE_NONE, lineterminator='\n')
 
+# Buffer size in bytes for reading and writing ASCII files
+_IO_BUFFER_SIZE = 1 << 20
+
+# Values of these types are written to Excel cells as is, other values are written as text
+_XLSX_CELL_TYPES = (bool, float, int, str)
+
+
+def _split_row_defn(row_defn: list, func_name: str) -> list:
+    """ Return row definition as [<key>, <add_func>, <rt_class>, <add_func_batch>] where the
+        optional add_func_batch is None if not supplied
+
+    :param row_defn:  row definition of form [<key>, <add_func>, <rt_class>(, <add_func_batch>)]
+    :type row_defn:  list
+
+    :param func_name:  name of calling function to report in the error message
+    :type func_name:  string
+    """
+    if len(row_defn) == 3:
+        return list(row_defn) + [None]
+    if len(row_defn) == 4:
+        return list(row_defn)
+    raise ValueError(
+        '%s: Row definition has insufficient number of values, ' % func_name
+        + 'expected 3 or 4 got %d' % len(row_defn)
+    )
+
+
+def _add_batch(add_func_batch: typing.Callable[[list], typing.Any], batch: list) -> None:
+    """ Pass a batch of dataclass records read from a worksheet to add_func_batch
+
+    :param add_func_batch:  function or method to add a list of dataclass records to database
+    :type add_func_batch:  function or method
+
+    :param batch:  dataclass records to add
+    :type batch:  list[dataclass]
+    """
+    try:
+        add_func_batch(batch)
+    except Exception as exc:
+        raise ValueError('Batch of %d records was not added, import stopped.' % len(batch)) from exc
+
 
 def base_read_file(
         infile: typing.Union[str, pathlib.Path],
         rt_list: typing.List[list],
-        csv_dialect: str = '__unixpipe'
+        csv_dialect: str = '__unixpipe',
+        batch_size: int = 10000
         ) -> int:
     """ Read pipe-delimited input file to dataclass records to add to database
 
     :param infile:  the path to open or file-like object
     :type infile:  string or pathlib.Path
 
-    :param rt_list:  list of lists where each member list has form [<prefix>, <add_func>, <rt_class>]
+    :param rt_list:  list of lists where each member list has form
+        [<prefix>, <add_func>, <rt_class>] or [<prefix>, <add_func>, <rt_class>, <add_func_batch>]
     :type rt_list:  list[list]
 
     :param rt_list[i][0]:  record type indicator when writing ASCII file (e.g., <prefix>|var1|...)
@@ -46,27 +90,49 @@ def base_read_file(
 
     :param rt_list[i][2]:  dataclass structure of input variables in order of appearance on the ASCII file.
     :type rt_list[i][2]:  dataclass
+
+    :param rt_list[i][3]:  optional function or method to add a list of dataclass records to database,
+        used instead of rt_list[i][1] if supplied
+    :type rt_list[i][3]:  function or method
+
+    :param csv_dialect:  name of registered csv dialect of the input file
+    :type csv_dialect:  string
+
+    :param batch_size:  maximum number of records passed in each call to rt_list[i][3]
+    :type batch_size:  integer
     """
+    row_defns = [_split_row_defn(row_defn, 'base_read_file') for row_defn in rt_list]
+    batches: typing.List[list] = [[] for _ in row_defns]
+    # Map each prefix to the row definitions applying to it in order of rt_list, definitions
+    # without a prefix apply to every row
+    no_prefix_defns = [(i, row_defn) for i, row_defn in enumerate(row_defns) if row_defn[0] is None]
+    prefix_defns = {
+        prefix: [(i, row_defn) for i, row_defn in enumerate(row_defns) if row_defn[0] in (None, prefix)]
+        for prefix in {row_defn[0] for row_defn in row_defns if row_defn[0] is not None}
+    }
     nrows_read = 0
-    with open(infile, 'r') as in_pipe:
+    # Let csv handle line endings as its documentation recommends and read in larger blocks
+    with open(infile, 'r', newline='', buffering=_IO_BUFFER_SIZE) as in_pipe:
         rows = csv.reader(in_pipe, csv_dialect)
         for row in rows:
-            for row_defn in rt_list:
-                try:
-                    [prefix, add_func, rt_class] = row_defn
-                except ValueError as exc:
-                    raise ValueError(
-                        'base_read_file: Row definition has insufficient number of values, '
-                        + 'expected 3 got %d' % len(row_defn)
-                    ) from exc
+            row_plan = prefix_defns.get(row[0], no_prefix_defns) if row else no_prefix_defns
+            for i, [prefix, add_func, rt_class, add_func_batch] in row_plan:
                 if prefix is not None:
-                    if row[0] != prefix:
-                        continue
                     row_inst = rt_class(*read_txt(row[1:]))
                 else:
                     row_inst = rt_class(*read_txt(row))
-                add_func(row_inst)
+                if add_func_batch is None:
+                    add_func(row_inst)
+                else:
+                    batches[i].append(row_inst)
+                    if len(batches[i]) >= batch_size:
+                        add_func_batch(batches[i])
+                        batches[i] = []
                 nrows_read = nrows_read + 1
+    # Add the records remaining in partially filled batches
+    for [_prefix, _add_func, _rt_class, add_func_batch], batch in zip(row_defns, batches):
+        if batch:
+            add_func_batch(batch)
     return nrows_read
 
 
@@ -94,7 +160,7 @@ def base_write_file(
     :type rt_list[i][2]:  dataclass
     """
     nrows_written = 0
-    with open(outfile, 'w') as out_pipe:
+    with open(outfile, 'w', buffering=_IO_BUFFER_SIZE) as out_pipe:
         f = csv.writer(out_pipe, csv_dialect)
         for row_defn in rt_list:
             try:
@@ -104,26 +170,28 @@ def base_write_file(
                     'base_write_file: Row definition has insufficient number of values, '
                     + 'expected 3 got %d' % len(row_defn)
                 ) from exc
-            for key in sorted(row_dict):
-                if prefix is None:
-                    row = write_txt_row(row_dict[key], rt_class)
-                else:
-                    row = [prefix] + write_txt_class(row_dict[key], rt_class)
-                f.writerow(row)
-                nrows_written = nrows_written + 1
+            # Rows are generated as written so the output is never held in memory
+            if prefix is None:
+                rows = (write_txt_row(row_dict[key], rt_class) for key in sorted(row_dict))
+            else:
+                rows = ([prefix] + write_txt_class(row_dict[key], rt_class) for key in sorted(row_dict))
+            f.writerows(rows)
+            nrows_written = nrows_written + len(row_dict)
     return nrows_written
 
 
 def base_read_xls(
         infile: typing.Union[str, pathlib.Path],
-        rt_list: typing.List[list]
+        rt_list: typing.List[list],
+        batch_size: int = 10000
         ) -> typing.Tuple[int, typing.List[int]]:
     """ Read older Excel files (.xls) to import data from each sheet into database
 
     :param infile:  the path to open or file-like object
     :type infile:  string or pathlib.Path
 
-    :param rt_list:  list of lists where each member list has form [<prefix>, <add_func>, <rt_class>]
+    :param rt_list:  list of lists where each member list has form
+        [<prefix>, <add_func>, <rt_class>] or [<prefix>, <add_func>, <rt_class>, <add_func_batch>]
     :type rt_list:  list[list]
 
     :param rt_list[i][0]:  name of worksheet containing record type
@@ -134,28 +202,33 @@ def base_read_xls(
 
     :param rt_list[i][2]:  dataclass storing the record with variables in same order as columns in worksheet
     :type rt_list[i][2]:  dataclass
+
+    :param rt_list[i][3]:  optional function to add a list of dataclasses to defined database,
+        used instead of rt_list[i][1] if supplied
+    :type rt_list[i][3]:  function or class method
+
+    :param batch_size:  maximum number of records passed in each call to rt_list[i][3]
+    :type batch_size:  integer
     """
     total_nrows_read = 0
     rt_counts = []
-    with xlrd.open_workbook(infile) as wb:
+    # Sheets are only loaded when requested and released once read
+    with xlrd.open_workbook(infile, on_demand=True) as wb:
         # This should use sheet name in future
         for row_defn in rt_list:
             rt_nrows_read = 0
-            try:
-                [sheet_name, add_func, rt_class] = row_defn
-            except ValueError as exc:
-                raise ValueError(
-                    'base_read_xls: Row definition has insufficient number of values, '
-                    + 'expected 3 got %d' % len(row_defn)
-                ) from exc
+            [sheet_name, add_func, rt_class, add_func_batch] = _split_row_defn(row_defn, 'base_read_xls')
+            batch = []
             try:
                 ws = wb.sheet_by_name(sheet_name)
             except Exception as exc:
                 raise ValueError(
                     'Error loading Sheet %s from Excel Workbook' % sheet_name
                 ) from exc
+            # row_values returns the stored values without building a Cell object per cell
+            row_values = ws.row_values
             for xlsrow in range(1, ws.nrows):
-                row = [str(ws.cell_value(xlsrow, j)) for j in range(ws.ncols)]
+                row = [str(val) for val in row_values(xlsrow)]
                 try:
                     row_inst = rt_class(*read_txt(row))
                 except TypeError as exc:
@@ -163,11 +236,20 @@ def base_read_xls(
                         'Excel Workbook has %d columns in Sheet %s, expecting %d'
                         % (ws.ncols, sheet_name, len(get_dc_type_hints(rt_class)))
                      ) from exc
-                try:
-                    add_func(row_inst)
-                except Exception as exc:
-                    raise ValueError('%s was not added, import stopped.' % repr(row_inst)) from exc
+                if add_func_batch is None:
+                    try:
+                        add_func(row_inst)
+                    except Exception as exc:
+                        raise ValueError('%s was not added, import stopped.' % repr(row_inst)) from exc
+                else:
+                    batch.append(row_inst)
+                    if len(batch) >= batch_size:
+                        _add_batch(add_func_batch, batch)
+                        batch = []
                 rt_nrows_read = rt_nrows_read + 1
+            if batch:
+                _add_batch(add_func_batch, batch)
+            wb.unload_sheet(sheet_name)
             rt_counts.append(rt_nrows_read)
             total_nrows_read = total_nrows_read + rt_nrows_read
     return total_nrows_read, rt_counts
@@ -175,14 +257,16 @@ def base_read_xls(
 
 def base_read_xlsx(
         infile: typing.Union[str, pathlib.Path],
-        rt_list: typing.List[list]
+        rt_list: typing.List[list],
+        batch_size: int = 10000
         ) -> typing.Tuple[int, typing.List[int]]:
     """ Read newer Excel files (.xlsx, .xlsm) to import data from each sheet into database
 
     :param infile:  the path to open or file-like object
     :type infile:  string or pathlib.Path
 
-    :param rt_list:  list of lists where each member list has form [<prefix>, <add_func>, <rt_class>]
+    :param rt_list:  list of lists where each member list has form
+        [<prefix>, <add_func>, <rt_class>] or [<prefix>, <add_func>, <rt_class>, <add_func_batch>]
     :type rt_list:  list[list]
 
     :param rt_list[i][0]:  name of worksheet containing record type
@@ -193,50 +277,173 @@ def base_read_xlsx(
 
     :param rt_list[i][2]:  dataclass storing the record with variables in same order as columns in worksheet
     :type rt_list[i][2]:  dataclass
+
+    :param rt_list[i][3]:  optional function to add a list of dataclasses to defined database,
+        used instead of rt_list[i][1] if supplied
+    :type rt_list[i][3]:  function or class method
+
+    :param batch_size:  maximum number of records passed in each call to rt_list[i][3]
+    :type batch_size:  integer
     """
     total_nrows_read = 0
     rt_counts = []
-    # Openpyxl loads workbook into memory so no with needed
-    wb = openpyxl.load_workbook(filename=infile)
-    for row_defn in rt_list:
-        try:
-            [sheet_name, add_func, rt_class] = row_defn
-        except ValueError as exc:
-            raise ValueError(
-                'base_read_xls: Row definition has insufficient number of values, '
-                + 'expected 3 got %d' % len(row_defn)
-            ) from exc
-        rt_nrows_read = 0
-        try:
-            ws = wb[sheet_name]
-        except KeyError as exc:
-            raise KeyError(
-                'Excel worksheet %s not found in workbook %s, make sure source sheet is defined and named correctly.'
-                % (sheet_name, str(infile))
-            ) from exc
-        xls_rows = ws.values
-        next(xls_rows)
-        for xlsrow in xls_rows:
-            row = [str(val) for val in xlsrow]
-            try:
-                row_inst = rt_class(*read_txt(row))
-            except TypeError as exc:
-                raise TypeError(
-                    'Excel workbook has %d columns in worksheet %s, expecting %d'
-                    % (len(row), sheet_name, len(get_dc_type_hints(rt_class)))
-                ) from exc
+    # Stream rows in read only mode, cell values rather than formulas are read. The workbook
+    # keeps the file open in this mode so it must be closed when done.
+    wb = openpyxl.load_workbook(filename=infile, read_only=True, data_only=True)
+    try:
+        for row_defn in rt_list:
+            [sheet_name, add_func, rt_class, add_func_batch] = _split_row_defn(row_defn, 'base_read_xlsx')
+            rt_nrows_read = 0
+            batch = []
             try:
-                add_func(row_inst)
-            except Exception as exc:
-                raise ValueError(
-                    'Running function on row_instance created an exception'
+                ws = wb[sheet_name]
+            except KeyError as exc:
+                raise KeyError(
+                    'Excel worksheet %s not found in workbook %s, '
+                    'make sure source sheet is defined and named correctly.'
+                    % (sheet_name, str(infile))
                 ) from exc
-            rt_nrows_read = rt_nrows_read + 1
-        rt_counts.append(rt_nrows_read)
-        total_nrows_read = total_nrows_read + rt_nrows_read
+            # Some writers store a stale A1:A1 dimension or none at all, in which case the stored
+            # dimension is dropped so all rows are read
+            if ws.max_column is None or (ws.max_row == 1 and ws.max_column == 1):
+                ws.reset_dimensions()
+            # Rows are padded with None up to the worksheet width, so a row ending in blank cells
+            # keeps its columns. Without a stored dimension the width is that of the header row.
+            # A worksheet narrower or wider than rt_class is reported below.
+            max_col = ws.max_column
+            if max_col is None:
+                header = list(next(ws.iter_rows(max_row=1, values_only=True), ()))
+                while header and header[-1] is None:
+                    header.pop()
+                max_col = len(header) or None
+            n_fields = len(get_dc_type_hints(rt_class))
+            for xlsrow in ws.iter_rows(min_row=2, max_col=max_col, values_only=True):
+                row = [str(val) for val in xlsrow]
+                try:
+                    row_inst = rt_class(*read_txt(row))
+                except TypeError as exc:
+                    raise TypeError(
+                        'Excel workbook has %d columns in worksheet %s, expecting %d'
+                        % (len(row), sheet_name, n_fields)
+                    ) from exc
+                if add_func_batch is None:
+                    try:
+                        add_func(row_inst)
+                    except Exception as exc:
+                        raise ValueError(
+                            'Running function on row_instance created an exception'
+                        ) from exc
+                else:
+                    batch.append(row_inst)
+                    if len(batch) >= batch_size:
+                        _add_batch(add_func_batch, batch)
+                        batch = []
+                rt_nrows_read = rt_nrows_read + 1
+            if batch:
+                _add_batch(add_func_batch, batch)
+            rt_counts.append(rt_nrows_read)
+            total_nrows_read = total_nrows_read + rt_nrows_read
+    finally:
+        wb.close()
     return total_nrows_read, rt_counts
 
 
+# Excel readers by lower case file suffix
+_EXCEL_READERS: typing.Dict[str, typing.Callable[..., typing.Tuple[int, typing.List[int]]]] = {
+    '.xls': base_read_xls,
+    '.xlsm': base_read_xlsx,
+    '.xlsx': base_read_xlsx,
+}
+
+
+def base_read_excel(
+        infile: typing.Union[str, pathlib.Path],
+        rt_list: typing.List[list],
+        batch_size: int = 10000
+        ) -> typing.Tuple[int, typing.List[int]]:
+    """ Read Excel file with the reader matching its suffix, base_read_xls for .xls and
+        base_read_xlsx for .xlsx and .xlsm
+
+    :param infile:  the path to open
+    :type infile:  string or pathlib.Path
+
+    :param rt_list:  list of lists where each member list has form
+        [<prefix>, <add_func>, <rt_class>] or [<prefix>, <add_func>, <rt_class>, <add_func_batch>]
+        as described in base_read_xls and base_read_xlsx
+    :type rt_list:  list[list]
+
+    :param batch_size:  maximum number of records passed in each call to rt_list[i][3]
+    :type batch_size:  integer
+    """
+    suffix = pathlib.Path(infile).suffix.lower()
+    excel_reader = _EXCEL_READERS.get(suffix)
+    if excel_reader is None:
+        raise ValueError(
+            'base_read_excel: Unsupported Excel file suffix %s, expected one of %s'
+            % (suffix, ', '.join(sorted(_EXCEL_READERS)))
+        )
+    return excel_reader(infile, rt_list, batch_size)
+
+
+def base_write_xlsx(
+        outfile: typing.Union[str, pathlib.Path],
+        rt_list: typing.List[list]
+        ) -> int:
+    """ Write newer Excel file (.xlsx) with one worksheet per record type from dictionary of dataclasses
+
+    :param outfile:  the path to write or file-like object
+    :type outfile:  string or pathlib.Path
+
+    :param rt_list:  list of lists where each member list has form [<sheet_name>, <row_dict>, <rt_class>]
+    :type rt_list:  list[list]
+
+    :param rt_list[i][0]:  name of worksheet to hold the record type
+    :type rt_list[i][0]:  string
+
+    :param rt_list[i][1]:  dictionary linking dataclass key variable to dataclass instance for all records
+    :type rt_list[i][1]:  dict[str, source dataclass]
+
+    :param rt_list[i][2]:  dataclass structure of output variables in order of the worksheet columns.
+        Note that this can be a subset of the source dataclass variables
+    :type rt_list[i][2]:  dataclass
+
+    Booleans, numbers and strings are written as typed cells and other values as text. Both None and
+    empty strings are written as empty cells which base_read_xlsx reads back as None.
+    """
+    # Check every row definition before any worksheet is started
+    for row_defn in rt_list:
+        if len(row_defn) != 3:
+            raise ValueError(
+                'base_write_xlsx: Row definition has insufficient number of values, '
+                + 'expected 3 got %d' % len(row_defn)
+            )
+    nrows_written = 0
+    # Rows are streamed to the file as they are appended so the workbook is never held in memory
+    wb = openpyxl.Workbook(write_only=True)
+    for [sheet_name, row_dict, rt_class] in rt_list:
+        ws = wb.create_sheet(sheet_name)
+        # Header row of variable names which base_read_xlsx skips
+        ws.append(list(get_dc_type_hints(rt_class)))
+        for key in sorted(row_dict):
+            ws.append([
+                v if type(v) in _XLSX_CELL_TYPES else val2txt(v)
+                for v in populate_list(row_dict[key], rt_class)
+            ])
+        nrows_written = nrows_written + len(row_dict)
+    wb.save(outfile)
+    return nrows_written
+
+
+@functools.lru_cache(maxsize=None)
+def _dc_field_names(dc: type) -> typing.Tuple[str, ...]:
+    """ Return names of the fields of dataclass dc in order, cached per dataclass
+
+    :param dc:  dataclass type
+    :type dc:  dataclass
+    """
+    return tuple(x.name for x in dataclasses.fields(dc))
+
+
 def base_add_item(
         item_container: typing.Union[list, object, typing.List[object]],
         item_src_class: type,
@@ -283,7 +490,10 @@ def base_add_item(
             raise ValueError(
                 'base_add_item: Incorrect types for item_container'
             ) from exc
-        item_inst = item_dest_class(*dataclasses.astuple(item_clean))
+        # Read the fields directly, astuple would deep copy values that were just formatted.
+        # fmt_dataclass already copies list, dict and set fields so the source item is not shared
+        item_clean_class: type = type(item_clean)
+        item_inst = item_dest_class(*[getattr(item_clean, name) for name in _dc_field_names(item_clean_class)])
         try:
             item_inst_key = getattr(item_inst, item_key)
         except AttributeError as exc:
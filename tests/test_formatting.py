@@ -2,8 +2,12 @@
 import pytest
 
 # Import global modules
+import collections
+import collections.abc
 import dataclasses
 import pathlib
+import sys
+import types
 import typing
 
 # Import module to test
@@ -12,45 +16,83 @@ from ..formatting import \
     fmt_dict, fmt_list, fmt_set, fmt_tuple, \
     fmt_value, fmt_dataclass, val2txt, txt2val, str2list, \
     process_container, get_ga_types, get_dc_type_hints, populate_list, \
-    define_dataclass, read_txt, write_txt, write_txt_class, write_txt_row
+    define_dataclass, read_txt, write_txt, write_txt_class, write_txt_row, \
+    _resolve_dc_type_hints
+
+# Generic aliases used throughout the tests
+LIST_STR = typing.List[str]
+LIST_INT = typing.List[int]
+SET_BOOL = typing.Set[bool]
+SET_INT = typing.Set[int]
+SET_STR = typing.Set[str]
+TUPLE_INT = typing.Tuple[int]
+TUPLE_LIST = typing.Tuple[list]
+DICT_II = typing.Dict[int, int]
+DICT_SI = typing.Dict[str, int]
+DICT_SL = typing.Dict[str, list]
+
+
+def _canon(x):
+    """ Canonical form of a container whose order is volatile, its type and its elements sorted by repr """
+    return type(x), tuple(sorted(x, key=repr))
 
 
 def test_get_ga_types():
-    assert get_ga_types(typing.List[str]) == (list, (str,))
+    assert get_ga_types(LIST_STR) == (list, (str,))
     T = typing.TypeVar('T', str, int)
     assert get_ga_types(typing.List[T]) == (list, (T,))
     with pytest.raises(TypeError):
         get_ga_types(list)
 
 
-def test_get_dc_type_hints():
-    @dataclasses.dataclass
-    class DtClass:
-        x: str = '1'
-        y: set = dataclasses.field(default_factory={2, 3})
-        z: int = 3
+@dataclasses.dataclass
+class _DtClassBasic:
+    x: str = '1'
+    y: set = dataclasses.field(default_factory=lambda: {2, 3})
+    z: int = 3
 
-    @dataclasses.dataclass
-    class DtSubClass(DtClass):
-        a: typing.List[int] = dataclasses.field(default_factory=[1, 2, 3, 4])
-        b: typing.Set[str] = dataclasses.field(default_factory={'a', 'b', 'c'})
-        c: typing.Tuple[int] = dataclasses.field(default_factory=(1, 2, 3))
-        d: typing.Dict[str, list] = dataclasses.field(
-            default_factory={'positions': ['QB', 'RB'], 'teams': ['DET', 'GB', 'CHI']}
-        )
-        e: typing.List[None] = dataclasses.field(default_factory=[None])
-
-    assert get_dc_type_hints(DtClass) == {
+
+@dataclasses.dataclass
+class _DtClassSub(_DtClassBasic):
+    a: LIST_INT = dataclasses.field(default_factory=lambda: [1, 2, 3, 4])
+    b: SET_STR = dataclasses.field(default_factory=lambda: {'a', 'b', 'c'})
+    c: TUPLE_INT = dataclasses.field(default_factory=lambda: (1, 2, 3))
+    d: DICT_SL = dataclasses.field(
+        default_factory=lambda: {'positions': ['QB', 'RB'], 'teams': ['DET', 'GB', 'CHI']}
+    )
+    e: typing.List[None] = dataclasses.field(default_factory=lambda: [None])
+
+
+@dataclasses.dataclass
+class _DtCallable:
+    f: typing.Callable[[int], str]
+    g: typing.Dict[str, LIST_INT]
+
+
+def test_get_dc_type_hints():
+    assert get_dc_type_hints(_DtClassBasic) == {
         'x': str, 'y': set, 'z': int
     }
-    assert get_dc_type_hints(DtSubClass) == {
+    assert get_dc_type_hints(_DtClassSub) == {
         'x': str, 'y': set, 'z': int,
-        'a': typing.List[int],
-        'b': typing.Set[str],
-        'c': typing.Tuple[int],
-        'd': typing.Dict[str, list],
+        'a': LIST_INT,
+        'b': SET_STR,
+        'c': TUPLE_INT,
+        'd': DICT_SL,
         'e': list
     }
+    # Hints are resolved per class so instances match and callers get their own copy
+    hints = get_dc_type_hints(_DtClassBasic(y={2, 3}))
+    assert hints == get_dc_type_hints(_DtClassBasic)
+    hints['x'] = int
+    assert get_dc_type_hints(_DtClassBasic)['x'] == str
+    # Repeated lookups of the same class are served from the cache
+    hits = _resolve_dc_type_hints.cache_info().hits
+    get_dc_type_hints(_DtClassSub)
+    assert _resolve_dc_type_hints.cache_info().hits > hits
+    with pytest.raises(TypeError):
+        get_dc_type_hints(1)
+    assert get_dc_type_hints(_DtCallable) == {'f': collections.abc.Callable, 'g': dict}
 
 
 def test_fmt_bool():
@@ -61,9 +103,9 @@ def test_fmt_bool():
     assert fmt_bool(True, list) == [True]
     assert fmt_bool(True, set) == {True}
     assert fmt_bool(True, tuple) == (True,)
-    assert fmt_bool(True, typing.List[str]) == ['True']
-    assert fmt_bool(False, typing.Set[int]) == {0}
-    assert fmt_bool(True, typing.Tuple[list]) == ([True],)
+    assert fmt_bool(True, LIST_STR) == ['True']
+    assert fmt_bool(False, SET_INT) == {0}
+    assert fmt_bool(True, TUPLE_LIST) == ([True],)
     with pytest.raises(ValueError):
         fmt_bool(True, float)
     with pytest.raises(ValueError):
@@ -79,8 +121,8 @@ def test_fmt_float():
     assert fmt_float(1.5, typing.List[float]) == [1.5]
     assert fmt_float(1.5, typing.Set[float]) == {1.5}
     assert fmt_float(1.5, typing.Tuple[float]) == (1.5,)
-    assert fmt_float(1.5, typing.List[str]) == ['1.5']
-    assert fmt_float(1.5, typing.Set[str]) == {'1.5'}
+    assert fmt_float(1.5, LIST_STR) == ['1.5']
+    assert fmt_float(1.5, SET_STR) == {'1.5'}
     assert fmt_float(1.5, typing.Tuple[str]) == ('1.5',)
     with pytest.raises(ValueError):
         fmt_float(1.5, int)
@@ -97,9 +139,9 @@ def test_fmt_int():
     assert fmt_int(37, list) == [37]
     assert fmt_int(37, set) == {37}
     assert fmt_int(37, tuple) == (37,)
-    assert fmt_int(37, typing.List[str]) == ['37']
-    assert fmt_int(37, typing.Set[bool]) == {True}
-    assert fmt_int(37, typing.Tuple[list]) == ([37],)
+    assert fmt_int(37, LIST_STR) == ['37']
+    assert fmt_int(37, SET_BOOL) == {True}
+    assert fmt_int(37, TUPLE_LIST) == ([37],)
     with pytest.raises(ValueError):
         fmt_int(37, dict)
 
@@ -117,8 +159,8 @@ def test_fmt_none():
     assert fmt_none(None, set) == set()
     assert fmt_none(None, tuple) == tuple()
     assert fmt_none(None, dict) == {}
-    assert fmt_none(None, typing.List[str]) == []
-    assert fmt_none(None, typing.Set[str]) == set()
+    assert fmt_none(None, LIST_STR) == []
+    assert fmt_none(None, SET_STR) == set()
     assert fmt_none(None, typing.Tuple[str]) == tuple()
 
 
@@ -132,24 +174,29 @@ def test_fmt_str():
     assert fmt_str('False', bool) is False
     assert fmt_str('foo.bar', pathlib.PosixPath) == pathlib.PosixPath('foo.bar')
     assert fmt_str('foo.bar', pathlib.Path) == pathlib.Path('foo.bar')
+    assert fmt_str('foo/bar', pathlib.PurePosixPath) == pathlib.PurePosixPath('foo/bar')
     assert fmt_str('', str) == ''
     assert fmt_str('', list) == []
     assert fmt_str('', set) == set()
     assert fmt_str('', tuple) == tuple()
     assert fmt_str('123', int) == 123
+    assert fmt_str('123.0', int) == 123
+    assert fmt_str('9007199254740993', int) == 9007199254740993
     assert fmt_str('123.4', float) == 123.4
     with pytest.raises(ValueError):
         fmt_str('123a', int)
-    assert fmt_str('', typing.List[str]) == []
-    assert fmt_str('', typing.Set[str]) == set()
+    assert fmt_str('', LIST_STR) == []
+    assert fmt_str('', SET_STR) == set()
     assert fmt_str('', typing.Tuple[str]) == tuple()
-    assert fmt_str('37', typing.List[int]) == [37]
-    assert fmt_str('37', typing.Set[bool]) == {False}
-    assert fmt_str('true', typing.Set[bool]) == {True}
-    assert fmt_str('37', typing.Tuple[list]) == (['37'],)
-    assert fmt_str('', typing.List[int]) == []
-    assert fmt_str('', typing.Set[int]) == set()
-    assert fmt_str('', typing.Tuple[int]) == tuple()
+    assert fmt_str('37', LIST_INT) == [37]
+    assert fmt_str('37', SET_BOOL) == {False}
+    assert fmt_str('true', SET_BOOL) == {True}
+    assert fmt_str('37', TUPLE_LIST) == (['37'],)
+    assert fmt_str('', LIST_INT) == []
+    assert fmt_str('', SET_INT) == set()
+    assert fmt_str('', TUPLE_INT) == tuple()
+    # Repeated paths are cached, path objects are immutable
+    assert fmt_str('foo.bar', pathlib.Path) is fmt_str('foo.bar', pathlib.Path)
 
 
 def test_fmt_dict():
@@ -157,7 +204,7 @@ def test_fmt_dict():
     assert fmt_dict({1: '1'}, dict) == {1: '1'}
     assert fmt_dict({1: '1'}, str) == '1,1'
     assert fmt_dict({1: '1'}, list) == [1, '1']
-    assert fmt_dict({1: '1'}, typing.List[int]) == [1, 1]
+    assert fmt_dict({1: '1'}, LIST_INT) == [1, 1]
     assert fmt_dict({1: '1'}, typing.Dict[int, str]) == {1: '1'}
     with pytest.raises(ValueError):
         fmt_dict({1: '1'}, bool)
@@ -170,31 +217,41 @@ def test_fmt_list():
     assert fmt_list([1, 2, 3], tuple) == (1, 2, 3)
     assert fmt_list([], str) == ''
     assert fmt_list([1, 2, 3], str) == '1,2,3'
+    assert fmt_list([1, None, True], str) == '1,,True'
+    assert fmt_list(['a', 'b'], str) == 'a,b'
     assert fmt_list([1, 2, 3, 4], dict) == {1: 2, 3: 4}
     with pytest.raises(ValueError):
         fmt_list([1, 2, 3], dict)
-    assert fmt_list([1, '1', 2, '2'], typing.List[str]) == ['1', '1', '2', '2']
-    assert fmt_list([1, '1', 2, '2'], typing.List[int]) == [1, 1, 2, 2]
-    assert fmt_list([1, '1', 2, '2'], typing.Dict[int, int]) == {1: 1, 2: 2}
-    assert fmt_list([1, '1', 2, '2'], typing.Dict[str, int]) == {'1': 1, '2': 2}
-    assert fmt_list([1, '1', 2, '2'], typing.Set[str]) == {'1', '2'}
-    assert fmt_list([1, '1', 2, '2'], typing.Tuple[int]) == (1, 1, 2, 2)
-    assert fmt_list([], typing.Set[str]) == set()
+    assert fmt_list([1, '1', 2, '2'], LIST_STR) == ['1', '1', '2', '2']
+    assert fmt_list([1, '1', 2, '2'], LIST_INT) == [1, 1, 2, 2]
+    same_type_list = [1, 2]
+    assert fmt_list(same_type_list, LIST_INT) == [1, 2]
+    assert fmt_list(same_type_list, LIST_INT) is not same_type_list
+    assert fmt_list([True, 1], LIST_INT) == [1, 1]
+    assert fmt_list([1, '1', 2, '2'], DICT_II) == {1: 1, 2: 2}
+    assert fmt_list([1, '1', 2, '2'], DICT_SI) == {'1': 1, '2': 2}
+    assert fmt_list([], DICT_SI) == {}
+    with pytest.raises(ValueError):
+        fmt_list([1, '1', 2], DICT_II)
+    assert fmt_list([1, '1', 2, '2'], SET_STR) == {'1', '2'}
+    assert fmt_list([1, '1', 2, '2'], TUPLE_INT) == (1, 1, 2, 2)
+    assert fmt_list([], SET_STR) == set()
 
 
 def test_fmt_set():
     assert fmt_set(set(), set) == set()
     assert fmt_set(set(), list) == []
     assert fmt_set(set(), tuple) == ()
-    assert fmt_set({1, '2'}, tuple) in [(1, '2'), ('2', 1)]
-    assert fmt_set({1, '2'}, list) in [[1, '2'], ['2', 1]]
-    assert fmt_set({1, '2'}, set) in [{1, '2'}, {'2', 1}]
+    assert _canon(fmt_set({1, '2'}, tuple)) == _canon((1, '2'))
+    assert _canon(fmt_set({1, '2'}, list)) == _canon([1, '2'])
+    assert fmt_set({1, '2'}, set) == {1, '2'}
     assert fmt_set({'a', '2'}, str) == '2,a'
-    assert fmt_set({1, '1', 2, '2'}, typing.List[str]) in [['1', '2'], ['2', '1']]
-    assert fmt_set({1, '1', 2, '2'}, typing.List[int]) == [1, 2]
-    assert fmt_set({1, '1', 2, '2'}, typing.Set[str]) == {'1', '2'}
-    assert fmt_set({1, '1', 2, '2'}, typing.Set[int]) == {1, 2}
-    assert fmt_set({1, '1', 2, '2'}, typing.Tuple[int]) == (1, 2)
+    assert fmt_set({1, '1'}, str) == '1'
+    assert _canon(fmt_set({1, '1', 2, '2'}, LIST_STR)) == _canon(['1', '2'])
+    assert fmt_set({1, '1', 2, '2'}, LIST_INT) == [1, 2]
+    assert fmt_set({1, '1', 2, '2'}, SET_STR) == {'1', '2'}
+    assert fmt_set({1, '1', 2, '2'}, SET_INT) == {1, 2}
+    assert fmt_set({1, '1', 2, '2'}, TUPLE_INT) == (1, 2)
     with pytest.raises(ValueError):
         fmt_set({1, 2}, bool)
 
@@ -207,88 +264,135 @@ def test_fmt_tuple():
     assert fmt_tuple((1, '2'), list) == [1, '2']    # Volatile going from unordered to ordered
     assert fmt_tuple((1, '2'), set) == {1, '2'}
     assert fmt_tuple((1, '2'), str) == '1,2'
-    assert fmt_tuple((1, '1', 2, '2'), typing.List[str]) == ['1', '1', '2', '2']
-    assert fmt_tuple((1, '1', 2, '2'), typing.List[int]) == [1, 1, 2, 2]
-    assert fmt_tuple((1, '1', 2, '2'), typing.Set[str]) == {'1', '2'}
-    assert fmt_tuple((1, '1', 2, '2'), typing.Set[int]) == {1, 2}
-    assert fmt_tuple((1, '1', 2, '2'), typing.Tuple[int]) == (1, 1, 2, 2)
+    assert fmt_tuple((1, '1', 2, '2'), LIST_STR) == ['1', '1', '2', '2']
+    assert fmt_tuple((1, '1', 2, '2'), LIST_INT) == [1, 1, 2, 2]
+    assert fmt_tuple((1, '1', 2, '2'), SET_STR) == {'1', '2'}
+    assert fmt_tuple((1, '1', 2, '2'), SET_INT) == {1, 2}
+    assert fmt_tuple((1, '1', 2, '2'), TUPLE_INT) == (1, 1, 2, 2)
     with pytest.raises(ValueError):
         fmt_tuple((1, 2), bool)
 
 
-def test_fmt_value():
+def _case_id(param):
+    """ Short readable id for a parametrized case, functions are named rather than shown by address """
+    if isinstance(param, types.FunctionType):
+        return param.__name__
+    return repr(param)[:40]
+
+
+# Cases of fn(value, fmt) == expected for the type specific formatter fn, fmt_value must dispatch to the
+# same result. The type of the result must also match expected
+ALL_FMT_CASES = [
     # String
-    assert fmt_value('123', str) == '123'
-    assert fmt_value('123', list) == ['123']
-    assert fmt_value('123', set) == {'123'}
-    assert fmt_value('123', tuple) == ('123',)
-    assert fmt_value('123', bool) is False
-    assert fmt_value('True', bool) is True
-    assert fmt_value('False', bool) is False
-    assert fmt_value('foo.bar', pathlib.PosixPath) == pathlib.PosixPath('foo.bar')
-    assert fmt_value('foo.bar', pathlib.Path) == pathlib.Path('foo.bar')
-    assert fmt_value('', str) == ''
-    assert fmt_value('', list) == []
-    assert fmt_value('', set) == set()
-    assert fmt_value('', tuple) == tuple()
-    with pytest.raises(ValueError):
-        fmt_value('123a', int)
+    (fmt_str, '123', str, '123'),
+    (fmt_str, '123', list, ['123']),
+    (fmt_str, '123', set, {'123'}),
+    (fmt_str, '123', tuple, ('123',)),
+    (fmt_str, '123', bool, False),
+    (fmt_str, 'True', bool, True),
+    (fmt_str, 'False', bool, False),
+    (fmt_str, 'foo.bar', pathlib.PosixPath, pathlib.PosixPath('foo.bar')),
+    (fmt_str, 'foo.bar', pathlib.Path, pathlib.Path('foo.bar')),
+    (fmt_str, '', str, ''),
+    (fmt_str, '', list, []),
+    (fmt_str, '', set, set()),
+    (fmt_str, '', tuple, tuple()),
     # List
-    assert fmt_value([], list) == []
-    assert fmt_value([1], list) == [1]
-    assert fmt_value([1, 2, 3], set) == {1, 2, 3}
-    assert fmt_value([1, 2, 3], tuple) == (1, 2, 3)
-    assert fmt_value([1, 2, 3], str) == '1,2,3'
-    assert fmt_value([1, 2, 3, 4], dict) == {1: 2, 3: 4}
-    with pytest.raises(ValueError):
-        fmt_value([1, 2, 3], dict)
+    (fmt_list, [], list, []),
+    (fmt_list, [1], list, [1]),
+    (fmt_list, [1, 2, 3], set, {1, 2, 3}),
+    (fmt_list, [1, 2, 3], tuple, (1, 2, 3)),
+    (fmt_list, [1, 2, 3], str, '1,2,3'),
+    (fmt_list, [1, 2, 3, 4], dict, {1: 2, 3: 4}),
     # Boolean
-    assert fmt_value(True, bool) is True
-    assert fmt_value(True, int) == 1
-    assert fmt_value(True, str) == 'True'
-    assert fmt_value(True, list) == [True]
-    assert fmt_value(True, set) == {True}
-    assert fmt_value(True, tuple) == (True,)
-    with pytest.raises(ValueError):
-        fmt_value(True, float)
-    with pytest.raises(ValueError):
-        fmt_value(True, dict)
+    (fmt_bool, True, bool, True),
+    (fmt_bool, True, int, 1),
+    (fmt_bool, True, str, 'True'),
+    (fmt_bool, True, list, [True]),
+    (fmt_bool, True, set, {True}),
+    (fmt_bool, True, tuple, (True,)),
     # Integer
-    assert fmt_value(37, int) == 37
-    assert fmt_value(37, bool) is True
-    assert fmt_value(0, bool) is False
-    assert fmt_value(1, bool) is True
-    assert fmt_value(37, str) == '37'
-    assert fmt_value(37, float) == 37.0
-    assert fmt_value(37, list) == [37]
-    assert fmt_value(37, set) == {37}
-    assert fmt_value(37, tuple) == (37,)
-    with pytest.raises(ValueError):
-        fmt_value(37, dict)
+    (fmt_int, 37, int, 37),
+    (fmt_int, 37, bool, True),
+    (fmt_int, 0, bool, False),
+    (fmt_int, 1, bool, True),
+    (fmt_int, 37, str, '37'),
+    (fmt_int, 37, float, 37.0),
+    (fmt_int, 37, list, [37]),
+    (fmt_int, 37, set, {37}),
+    (fmt_int, 37, tuple, (37,)),
     # Set
-    assert fmt_value({1, '2'}, tuple) in [('2', 1), (1, '2')]
-    assert fmt_value({1, '2'}, list) in [['2', 1], [1, '2']]
-    assert fmt_value({1, '2'}, set) == {1, '2'}
-    assert fmt_value({1, '2'}, str) == '1,2'
+    (fmt_set, {1, '2'}, set, {1, '2'}),
+    (fmt_set, {1, '2'}, str, '1,2'),
+]
+
+# Cases that only exercise the fmt_value dispatcher itself
+FMT_VALUE_CASES = [
+    # Subclass of a base type falls through to the formatter of its base
+    (collections.OrderedDict({1: '1'}), list, [1, '1']),
+]
+
+# Cases of fmt_value(value, fmt) that raise ValueError
+FMT_VALUE_ERRORS = [
+    ('123a', int),
+    ([1, 2, 3], dict),
+    (True, float),
+    (True, dict),
+    (37, dict),
+    (pathlib.Path('./'), str),
+]
+
+
+@pytest.mark.parametrize('fn, value, fmt, expected', ALL_FMT_CASES, ids=_case_id)
+def test_dispatch_matches_specific(fn, value, fmt, expected):
+    result = fn(value, fmt)
+    assert result == expected
+    assert type(result) is type(expected)
+    dispatched = fmt_value(value, fmt)
+    assert dispatched == expected
+    assert type(dispatched) is type(expected)
+
+
+@pytest.mark.parametrize('value, fmt, expected', FMT_VALUE_CASES, ids=_case_id)
+def test_fmt_value(value, fmt, expected):
+    result = fmt_value(value, fmt)
+    assert result == expected
+    assert type(result) is type(expected)
+
+
+@pytest.mark.parametrize('value, fmt', FMT_VALUE_ERRORS, ids=_case_id)
+def test_fmt_value_errors(value, fmt):
     with pytest.raises(ValueError):
-        fmt_value(pathlib.Path('./'), str)
+        fmt_value(value, fmt)
 
 
-def test_fmt_dataclass():
-    # Set up
-    @dataclasses.dataclass
-    class Test:
-        b: bool
-        f: float
-        n: int
-        s: str
-        t: tuple
-        li: list
-        si: typing.Set[int]
+def test_fmt_value_unordered():
+    # Order of a set is volatile when going to an ordered type
+    assert _canon(fmt_value({1, '2'}, tuple)) == _canon((1, '2'))
+    assert _canon(fmt_value({1, '2'}, list)) == _canon([1, '2'])
+
 
+@dataclasses.dataclass
+class _FmtDCTest:
+    b: bool
+    f: float
+    n: int
+    s: str
+    t: tuple
+    li: list
+    si: SET_INT
+
+
+@dataclasses.dataclass
+class _FmtDCOuter:
+    name: str
+    inner: _FmtDCTest
+
+
+def test_fmt_dataclass():
     # Verify result of txt2val, all list-like things have been cast as a list
     dc_val = [True, 2, 4, 'foo.bar', ['foo', 'bar'], ['foo', 'bar'], ['1', '2']]
-    dc = Test(*dc_val)
+    dc = _FmtDCTest(*dc_val)
     assert dc.b is True
     assert dc.f == 2
     assert dc.n == 4
@@ -305,6 +409,12 @@ def test_fmt_dataclass():
     assert dcf.t == ('foo', 'bar')
     assert dcf.li == ['foo', 'bar']
     assert dcf.si == {1, 2}
+    # Containers already of their type hint are copied, their items are shared
+    assert dcf.li is not dc.li
+    dc_nested = _FmtDCTest(True, 2.0, 4, 'foo.bar', ('foo', 'bar'), [['foo']], {1, 2})
+    dcf_nested = fmt_dataclass(dc_nested)
+    assert dcf_nested.si is not dc_nested.si
+    assert dcf_nested.li[0] is dc_nested.li[0]
 
     class FailTest:
         def __init__(self, b, f):
@@ -313,10 +423,48 @@ def test_fmt_dataclass():
     ft = FailTest('1', '2')
     with pytest.raises(TypeError):
         fmt_dataclass(ft)
+    with pytest.raises(TypeError):
+        fmt_dataclass(_FmtDCTest)
 
+    # Nested dataclasses are kept as is
+    dco = fmt_dataclass(_FmtDCOuter(1, dcf))
+    assert dco.name == '1'
+    assert dco.inner is dcf
+
+    # The field that cannot be formatted is reported
     dc.b = {1, 2}
-    with pytest.raises(ValueError):
+    with pytest.raises(ValueError, match='Cannot handle putting field b = {1, 2} into format') as exc_info:
         fmt_dataclass(dc)
+    assert isinstance(exc_info.value.__cause__, ValueError)
+
+    # Errors not caused by a field are raised as is
+    @dataclasses.dataclass
+    class PostInitFail:
+        n: int
+
+        def __post_init__(self):
+            if self.n < 0:
+                raise ValueError('n must not be negative')
+
+    pf = PostInitFail(1)
+    pf.n = -1
+    with pytest.raises(ValueError, match='^n must not be negative$'):
+        fmt_dataclass(pf)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason='keyword-only fields need python 3.10+')
+def test_fmt_dataclass_kw_only():
+    # Keyword-only fields follow positional ones in __init__ and must be passed by name
+    @dataclasses.dataclass
+    class KwOnlyTest:
+        n: int
+        li: list = dataclasses.field(kw_only=True)
+        s: str = '1'
+
+    dcf = fmt_dataclass(KwOnlyTest('4', li=('a', 'b'), s=2))
+    assert dcf == KwOnlyTest(4, li=['a', 'b'], s='2')
+    assert fmt_dataclass(dcf) == dcf
+
 
 #
 # Routines to convert a value from one type to text and vice versa
@@ -326,6 +474,7 @@ def test_fmt_dataclass():
 def test_str2list():
     assert str2list('12') == ['12']
     assert str2list('1,2') == ['1,2']
+    assert str2list('') == []
     assert str2list([]) == []
     assert str2list(['1', '2']) == ['1', '2']
     with pytest.raises(ValueError):
@@ -344,6 +493,8 @@ def test_val2txt():
     assert val2txt([1, 2]) == '1,2'
     assert val2txt((1,)) == '1'
     assert val2txt((1, 2)) == '1,2'
+    assert val2txt((2, 1)) == '2,1'
+    assert val2txt({3, 1, 2}) == '1,2,3'
     assert val2txt({'1': 's'}) == '1,s'
     assert val2txt([[1, 2], 3]) == '1,2,3'
     assert val2txt([1, 's', True]) == '1,s,True'
@@ -367,21 +518,50 @@ def test_txt2val():
     assert txt2val('0o770x') == '0o770x'
     assert txt2val('0x110') == 1*256 + 1*16
     assert txt2val('0x110x') == '0x110x'
+    assert txt2val('0X1F') == 31
+    assert txt2val('0B11') == 3
     assert txt2val('True') is True
     assert txt2val('False') is False
     assert txt2val('true') is True
+    assert txt2val('FALSE') is False
+    assert txt2val('Truey') == 'Truey'
     assert txt2val('1,2') == [1, 2]
     assert txt2val('a,1') == ['a', 1]
     assert txt2val('1,s,True') == [1, 's', True]
+    assert txt2val('-12') == -12
+    assert txt2val('+7') == 7
+    assert txt2val('-') == '-'
+    assert txt2val('-2.5') == -2.5
+    assert txt2val('1e3') == 1000
+    assert txt2val(' 12 ') == 12
+    assert txt2val('12345678901234567890') == 12345678901234567890
+    assert txt2val('1e400') == float('inf')
+    assert txt2val('inf') == 'inf'
+    assert txt2val('1.2.3') == '1.2.3'
+    # Underscores grouping digits as in python literals
+    assert txt2val('1_000') == 1000
+    assert txt2val('1_000.5') == 1000.5
+    assert txt2val('1e1_0') == 10**10
+    assert txt2val('0b1_0') == 2
+    assert txt2val('0o_17') == 15
+    assert txt2val('0x_ff') == 255
+    assert txt2val('1__0') == '1__0'
+    assert txt2val('_1') == '_1'
+    assert txt2val('1_') == '1_'
+    # Surrounding whitespace of prefixed integers
+    assert txt2val('0xF ') == 15
+    assert txt2val(' 0b1') == 1
+    assert txt2val('0o7 ') == 7
+
+
+@dataclasses.dataclass
+class _ProcDC:
+    x: int
+    y: set
 
 
 def test_process_container():
     # Set up
-    @dataclasses.dataclass
-    class TestDC:
-        x: int
-        y: set
-
     class FailTest:
         def __init__(self, b, f):
             self.b = b
@@ -398,75 +578,74 @@ def test_process_container():
     with pytest.raises(ValueError):
         process_container({'1', '2'}, str)
     # Container is list of parameters for one dataclass
-    assert process_container([1, {1, 2}], TestDC) == [TestDC(x=1, y={1, 2})]
+    assert process_container([1, {1, 2}], _ProcDC) == [_ProcDC(x=1, y={1, 2})]
     # Container is a list of list of parameters to define a list of dataclasses
-    assert process_container([[1, {1, 2}], [2, {3, 4}]], TestDC) == [TestDC(x=1, y={1, 2}), TestDC(2, {3, 4})]
+    assert process_container([[1, {1, 2}], [2, {3, 4}]], _ProcDC) == [_ProcDC(x=1, y={1, 2}), _ProcDC(2, {3, 4})]
     # Container is dataclass
-    assert process_container(TestDC(1, {1, 2}), TestDC) == [TestDC(x=1, y={1, 2})]
+    assert process_container(_ProcDC(1, {1, 2}), _ProcDC) == [_ProcDC(x=1, y={1, 2})]
     # Container is a list of dataclasses
-    assert process_container([TestDC(1, {1, 2}), TestDC(2, {3, 4})], TestDC) \
-        == [TestDC(x=1, y={1, 2}), TestDC(2, {3, 4})]
+    assert process_container([_ProcDC(1, {1, 2}), _ProcDC(2, {3, 4})], _ProcDC) \
+        == [_ProcDC(x=1, y={1, 2}), _ProcDC(2, {3, 4})]
     with pytest.raises(ValueError):
-        process_container([TestDC(1, {1, 2}), [1, {1, 2}]], TestDC)
+        process_container([_ProcDC(1, {1, 2}), [1, {1, 2}]], _ProcDC)
     with pytest.raises(TypeError):
-        process_container([TestDC(1, {1, 2}), [1, {1, 2}]], FailTest)
+        process_container([_ProcDC(1, {1, 2}), [1, {1, 2}]], FailTest)
 
 #
 # Helpers to read and write dataclasses to lists and vice versa
 #
 
 
-def test_populate_list():
-    class TestClass:
-        def __init__(self, name, groups, platforms, other=None):
-            self.name = name
-            self.groups = groups
-            self.platforms = platforms
-            self.other = other
+class _SrcClass:
+    def __init__(self, name, groups, platforms, other=None):
+        self.name = name
+        self.groups = groups
+        self.platforms = platforms
+        self.other = other
 
-    @dataclasses.dataclass
-    class DtClass:
-        groups: list
-        name: str
-        platforms: list
 
-    @dataclasses.dataclass
-    class DtClass2:
-        groups: list
-        name: str
-        platforms: list
-        name2: str
+@dataclasses.dataclass
+class _DtClass:
+    groups: list
+    name: str
+    platforms: list
+
 
+@dataclasses.dataclass
+class _DtClass2:
+    groups: list
+    name: str
+    platforms: list
+    name2: str
+
+
+def test_populate_list():
     assert populate_list(
-                TestClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), DtClass
+                _SrcClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), _DtClass
             ) == [['g1', 'g2'], 'nemo', ['p1', 'p2']]
     assert populate_list(
-                TestClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), DtClass2
+                _SrcClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), _DtClass2
             ) == [['g1', 'g2'], 'nemo', ['p1', 'p2'], '']
 
+    # Attributes served by __getattr__ are not listed by dir so are treated as missing
+    class _GetattrClass(_SrcClass):
+        def __getattr__(self, name):
+            return 'dynamic'
 
-def test_define_dataclass():
-    class TestClass:
-        def __init__(self, name, groups, platforms, other=None):
-            self.name = name
-            self.groups = groups
-            self.platforms = platforms
-            self.other = other
+    assert populate_list(
+                _GetattrClass('nemo', ['g1', 'g2'], ['p1', 'p2']), _DtClass2
+            ) == [['g1', 'g2'], 'nemo', ['p1', 'p2'], '']
 
-    @dataclasses.dataclass
-    class DtClass:
-        groups: list
-        name: str
-        platforms: list
 
+def test_define_dataclass():
     assert define_dataclass(
-                TestClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), DtClass
-            ) == DtClass(
+                _SrcClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), _DtClass
+            ) == _DtClass(
                 groups=['g1', 'g2'], name='nemo', platforms=['p1', 'p2']
             )
     with pytest.raises(TypeError):
         define_dataclass(
-                TestClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), TestClass
+                _SrcClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), _SrcClass
             )
 
 
@@ -477,68 +656,29 @@ def test_read_txt():
 
 
 def test_write_txt_class():
-    # Set up
-    class TestClass:
-        def __init__(self, name, groups, platforms, other=None):
-            self.name = name
-            self.groups = groups
-            self.platforms = platforms
-            self.other = other
-
-    @dataclasses.dataclass
-    class DtClass:
-        groups: list
-        name: str
-        platforms: list
     assert write_txt_class(
-                TestClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), DtClass
+                _SrcClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), _DtClass
             ) == ['g1,g2', 'nemo', 'p1,p2']
     with pytest.raises(TypeError):
         write_txt_class(
-                TestClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), TestClass
+                _SrcClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), _SrcClass
             )
 
 
 def test_write_txt():
-    # Set up
-    class TestClass:
-        def __init__(self, name, groups, platforms, other=None):
-            self.name = name
-            self.groups = groups
-            self.platforms = platforms
-            self.other = other
-
-    @dataclasses.dataclass
-    class DtClass:
-        groups: list
-        name: str
-        platforms: list
     assert write_txt(
-        DtClass(groups=['g1', 'g2'], name='nemo', platforms=['p1', 'p2'])
+        _DtClass(groups=['g1', 'g2'], name='nemo', platforms=['p1', 'p2'])
     ) == ['g1,g2', 'nemo', 'p1,p2']
 
 
 def test_write_txt_row():
-    # assert write_txt_row()
-    class TestClass:
-        def __init__(self, name, groups, platforms, other=None):
-            self.name = name
-            self.groups = groups
-            self.platforms = platforms
-            self.other = other
-
-    @dataclasses.dataclass
-    class DtClass:
-        groups: list
-        name: str
-        platforms: list
     assert write_txt_class(
-                TestClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), DtClass
+                _SrcClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), _DtClass
             ) == ['g1,g2', 'nemo', 'p1,p2']
 
     assert write_txt_row(
-                TestClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), DtClass
+                _SrcClass('nemo', ['g1', 'g2'], ['p1', 'p2'], 'thing'), _DtClass
             ) == ['g1,g2', 'nemo', 'p1,p2']
     assert write_txt_row(
-        DtClass(groups=['g1', 'g2'], name='nemo', platforms=['p1', 'p2'])
+        _DtClass(groups=['g1', 'g2'], name='nemo', platforms=['p1', 'p2'])
     ) == ['g1,g2', 'nemo', 'p1,p2']
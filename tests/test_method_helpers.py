@@ -4,10 +4,16 @@ import pytest
 # Import global modules
 import pathlib
 import dataclasses
+import re
+import zipfile
+
+# Dependent modules
+import openpyxl
 
 # Import items to test
 from ..method_helpers import \
-    base_add_item, base_read_file, base_read_xls, base_read_xlsx, base_write_file
+    base_add_item, base_read_excel, base_read_file, base_read_xls, base_read_xlsx, base_write_file, \
+    base_write_xlsx
 
 # Root directory
 root = pathlib.Path.cwd()
@@ -47,6 +53,12 @@ class UmbrellaClass:
     def add_t3(self, t3_inst):
         self.t3dict[t3_inst.field1] = t3_inst
 
+    def add_t1_batch(self, t1_list):
+        self.t1dict.update((t1_inst.var1, t1_inst) for t1_inst in t1_list)
+
+    def add_t2_batch(self, t2_list):
+        self.t2dict.update((t2_inst.field1, t2_inst) for t2_inst in t2_list)
+
 
 # We test xls and xlsx first to provide a base instance for testing rest
 
@@ -74,6 +86,19 @@ def test_base_read_xls():
         'Value1.4': Type2Class(field1='Value1.4', field2='Value2.4')
     }
 
+    # Add records in batches instead of one at a time
+    uc_batch = UmbrellaClass('Test XLS batch')
+    assert base_read_xls(
+        root / 'tests' / 'test_xls.xls',
+        [
+            ['Type1', None, Type1Class, uc_batch.add_t1_batch],
+            ['Type2', None, Type2Class, uc_batch.add_t2_batch]
+        ],
+        batch_size=2
+    ) == (9, [5, 4])
+    assert uc_batch.t1dict == uc.t1dict
+    assert uc_batch.t2dict == uc.t2dict
+
     # Create various errors
 
     # Incorrect number of list items
@@ -113,7 +138,7 @@ def test_base_read_xls():
         )
 
 
-def test_base_read_xlsx():
+def test_base_read_xlsx(tmp_path):
     uc = UmbrellaClass('Test XLSX')
     assert base_read_xlsx(
         root / 'tests' / 'test_xlsx.xlsx',
@@ -136,6 +161,94 @@ def test_base_read_xlsx():
         'Value1.4': Type2Class(field1='Value1.4', field2='Value2.4')
     }
 
+    # Add records in batches instead of one at a time
+    uc_batch = UmbrellaClass('Test XLSX batch')
+    batch_sizes = []
+
+    def add_t1_batch(t1_list):
+        batch_sizes.append(len(t1_list))
+        uc_batch.add_t1_batch(t1_list)
+
+    assert base_read_xlsx(
+        root / 'tests' / 'test_xlsx.xlsx',
+        [
+            ['Type1', None, Type1Class, add_t1_batch]
+        ],
+        batch_size=2
+    ) == (5, [5])
+    assert batch_sizes == [2, 2, 1]
+    assert uc_batch.t1dict == uc.t1dict
+
+    # Worksheets without a stored dimension, a row ending in a blank cell is padded
+    uc_nodim = UmbrellaClass('Test XLSX no dimension')
+    assert base_read_xlsx(
+        root / 'tests' / 'test_xlsx_nodim.xlsx',
+        [
+            ['Type1', uc_nodim.add_t1, Type1Class],
+            ['Type2', uc_nodim.add_t2, Type2Class]
+        ]
+    ) == (5, [3, 2])
+    assert uc_nodim.t1dict == {
+        'Value1.1': Type1Class(var1='Value1.1', var2='Value2.1'),
+        'Value1.2': Type1Class(var1='Value1.2', var2=None),
+        'Value1.3': Type1Class(var1='Value1.3', var2='Value2.3')
+    }
+
+    # Without a stored dimension the header row sets the width, so classes narrower or wider
+    # than the worksheet are still reported
+    @dataclasses.dataclass
+    class Type1WideClass:
+        var1: str
+        var2: str
+        var3: str
+
+    with pytest.raises(TypeError, match='has 2 columns in worksheet Type1, expecting 1'):
+        base_read_xlsx(
+            root / 'tests' / 'test_xlsx_nodim.xlsx',
+            [
+                ['Type1', uc_nodim.add_t3, Type3Class]
+            ]
+        )
+    with pytest.raises(TypeError, match='has 2 columns in worksheet Type1, expecting 3'):
+        base_read_xlsx(
+            root / 'tests' / 'test_xlsx_nodim.xlsx',
+            [
+                ['Type1', uc_nodim.add_t1, Type1WideClass]
+            ]
+        )
+
+    # Worksheets with a stale A1:A1 dimension are still read in full, including an added row
+    # ending in an empty cell
+    with zipfile.ZipFile(root / 'tests' / 'test_xlsx.xlsx') as zin, \
+            zipfile.ZipFile(tmp_path / 'test_xlsx_dim.xlsx', 'w') as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename.startswith('xl/worksheets/'):
+                data = re.sub(rb'<dimension ref="[^"]*"/>', b'<dimension ref="A1:A1"/>', data)
+            if item.filename == 'xl/worksheets/sheet1.xml':
+                data = data.replace(
+                    b'</sheetData>',
+                    b'<row r="7"><c r="A7" t="inlineStr"><is><t>Value1.6</t></is></c></row></sheetData>'
+                )
+            zout.writestr(item, data)
+    uc_dim = UmbrellaClass('Test XLSX dimension')
+    assert base_read_xlsx(
+        tmp_path / 'test_xlsx_dim.xlsx',
+        [
+            ['Type1', uc_dim.add_t1, Type1Class],
+            ['Type2', uc_dim.add_t2, Type2Class]
+        ]
+    ) == (10, [6, 4])
+    assert uc_dim.t1dict == dict(uc.t1dict, **{'Value1.6': Type1Class(var1='Value1.6', var2=None)})
+    assert uc_dim.t2dict == uc.t2dict
+    with pytest.raises(TypeError, match='has 2 columns in worksheet Type2, expecting 1'):
+        base_read_xlsx(
+            tmp_path / 'test_xlsx_dim.xlsx',
+            [
+                ['Type2', uc_dim.add_t3, Type3Class]
+            ]
+        )
+
     # Create various errors
 
     # Incorrect number of list items
@@ -175,6 +288,30 @@ def test_base_read_xlsx():
         )
 
 
+def test_base_read_excel():
+    # Each suffix is read by its own reader with the same results
+    for excel_file in ['test_xls.xls', 'test_xlsx.xlsx']:
+        uc = UmbrellaClass('Test Excel')
+        assert base_read_excel(
+            root / 'tests' / excel_file,
+            [
+                ['Type1', uc.add_t1, Type1Class],
+                ['Type2', uc.add_t2, Type2Class]
+            ]
+        ) == (9, [5, 4])
+        assert len(uc.t1dict) == 5
+        assert len(uc.t2dict) == 4
+
+    # Unsupported suffix
+    with pytest.raises(ValueError):
+        base_read_excel(
+            root / 'tests' / 'test_asc.txt',
+            [
+                ['Type1', uc.add_t1, Type1Class]
+            ]
+        )
+
+
 def test_base_write_file():
     uc = UmbrellaClass('Test XLSX')
     assert base_read_xlsx(
@@ -237,6 +374,68 @@ def test_base_write_file():
         + 'Type2|Value1.4|Value2.4\n'
 
 
+def test_base_write_xlsx(tmp_path):
+    uc = UmbrellaClass('Test XLSX')
+    assert base_read_xlsx(
+        root / 'tests' / 'test_xlsx.xlsx',
+        [
+            ['Type1', uc.add_t1, Type1Class],
+            ['Type2', uc.add_t2, Type2Class]
+        ]
+    ) == (9, [5, 4])
+
+    # Write one worksheet per record type then read them back
+    assert base_write_xlsx(
+        tmp_path / 'test_xlsx_out.xlsx',
+        [
+            ['Type1', uc.t1dict, Type1Class],
+            ['Type2', uc.t2dict, Type2Class]
+        ]
+    ) == 9
+    uc_out = UmbrellaClass('Test XLSX out')
+    assert base_read_xlsx(
+        tmp_path / 'test_xlsx_out.xlsx',
+        [
+            ['Type1', uc_out.add_t1, Type1Class],
+            ['Type2', uc_out.add_t2, Type2Class]
+        ]
+    ) == (9, [5, 4])
+    assert uc_out.t1dict == uc.t1dict
+    assert uc_out.t2dict == uc.t2dict
+
+    # Numbers are written as typed cells and containers as text, empty strings and None are both
+    # written as empty cells so are read back as None
+    @dataclasses.dataclass
+    class MixedClass:
+        key: int
+        empty: str
+        missing: str
+        items: list
+
+    mixed_in = {3: MixedClass(3, '', None, [1, 2])}
+    assert base_write_xlsx(tmp_path / 'test_xlsx_mixed.xlsx', [['Mixed', mixed_in, MixedClass]]) == 1
+    ws = openpyxl.load_workbook(tmp_path / 'test_xlsx_mixed.xlsx')['Mixed']
+    assert [cell.value for cell in ws[2]] == [3, None, None, '1,2']
+    mixed_out = {}
+    assert base_read_xlsx(
+        tmp_path / 'test_xlsx_mixed.xlsx',
+        [
+            ['Mixed', lambda x: mixed_out.update({x.key: x}), MixedClass]
+        ]
+    ) == (1, [1])
+    assert mixed_out == {3: MixedClass(3, None, None, [1, 2])}
+
+    # Trigger ValueError if rt_lists is incomplete
+    with pytest.raises(ValueError):
+        base_write_xlsx(
+            tmp_path / 'test_xlsx_bad.xlsx',
+            [
+                ['Type1', uc.t1dict, Type1Class],
+                ['Type2', uc.t2dict]
+            ]
+        )
+
+
 def test_base_read_file():
     # Read in base line
     uc0 = UmbrellaClass('Test XLSX')
@@ -269,6 +468,18 @@ def test_base_read_file():
     ) == 5
     assert uc0.t1dict == uc2.t1dict
 
+    # Read in t1 class from .._2 in batches
+    uc3 = UmbrellaClass('Test XLSX')
+    assert base_read_file(
+        root / 'tests' / 'test_asc_2.txt',
+        [
+            ['Type1', None, Type1Class, uc3.add_t1_batch],
+            ['Type2', uc3.add_t2, Type2Class]
+        ],
+        batch_size=2
+    ) == 9
+    assert uc0 == uc3
+
     # Trigger Value Error from deficient rt_list
     with pytest.raises(ValueError):
         base_read_file(
@@ -335,3 +546,14 @@ def test_base_add_item():
     ) == [5, 6]
     assert a.dc_dict[5] == DestDC(5, '5', (5,), [])
     assert a.dc_dict[6] == DestDC(6, '6', ('6',), [])
+
+    # Stored items do not share list fields with the source item
+    @dataclasses.dataclass
+    class ListDC:
+        x: int
+        w: list
+
+    src = ListDC(7, ['a'])
+    assert base_add_item(src, ListDC, ListDC, 'x', a.dc_dict) == [7]
+    src.w.append('b')
+    assert a.dc_dict[7] == ListDC(7, ['a'])